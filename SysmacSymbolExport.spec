@@ -15,13 +15,15 @@ a = Analysis(
     pathex=['src\\'],
     binaries=[],
     datas=[
-        ('SysmacSymbolExport.ico','.')
+        ('SysmacSymbolExport.ico','.'),
+        ('src\\data\\internal_types.xml','data')
     ],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Modules never used by the application: smaller archive to extract at each start
+    excludes=['unittest', 'pydoc', 'doctest', 'pdb', 'xmlrpc', 'lib2to3', 'test'],
     noarchive=False,
     optimize=0,
 )
@@ -37,7 +39,8 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    # UPX compressed binaries have to be decompressed at each start
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
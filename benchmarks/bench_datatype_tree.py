@@ -0,0 +1,74 @@
+"""
+Regression benchmark of the DataType tree builder on deeply nested STRUCT-of-STRUCT definitions.
+
+The build time must grow linearly with the number of DataType elements and each element must be
+converted into exactly one SysmacDataType, whatever the nesting depth.
+
+Usage: python benchmarks/bench_datatype_tree.py [--depths 4 8 16 32 64] [--members 4]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from sysmac_data_type import SysmacDataType
+from utils import load_data_types
+
+
+def nested_struct_xml(depth: int, members: int) -> str:
+    """ A STRUCT whose last member is a nested STRUCT, itself nesting another STRUCT, ... up to depth levels """
+    xml = ''
+    for level in reversed(range(depth)):
+        leaves = ''.join(f'<DataType Name="Leaf{level}_{m}" BaseType="DINT" />' for m in range(members))
+        xml = f'<DataType Name="Level{level}" BaseType="STRUCT">{leaves}{xml}</DataType>'
+    return f'<Data><Body>{xml}</Body></Data>'
+
+
+def count_nodes(data_type: SysmacDataType) -> int:
+    return 1 + sum(count_nodes(child) for child in data_type.children)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depths', type=int, nargs='+', default=[4, 8, 16, 32, 64, 128])
+    parser.add_argument('--members', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failures = 0
+    print(f'{"Depth":>6}  {"Elements":>9}  {"Nodes":>9}  {"Tree (ms)":>10}  {"Stream (ms)":>11}  {"us/element":>10}')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for depth in args.depths:
+            xml = nested_struct_xml(depth, args.members)
+            root = ET.fromstring(xml)
+            element_count = len(list(root.iter('DataType')))
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                data_type = SysmacDataType.import_from_xml(root.find('Body/DataType'))
+            tree_duration = (time.perf_counter() - start) / args.repeat
+
+            datatype_file = Path(tmp_dir) / f'depth_{depth}.xml'
+            datatype_file.write_text(xml, encoding='utf-8')
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                data = load_data_types(datatype_file)
+            stream_duration = (time.perf_counter() - start) / args.repeat
+
+            node_count = count_nodes(data_type)
+            if node_count != element_count or count_nodes(data['Level0']) != element_count:
+                failures += 1
+            print(f'{depth:>6}  {element_count:>9}  {node_count:>9}  {tree_duration * 1e3:>10.2f}  '
+                  f'{stream_duration * 1e3:>11.2f}  {tree_duration * 1e6 / element_count:>10.2f}')
+
+    if failures:
+        print(f'{failures} definitions were not built with exactly one node per element', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Benchmarks of the export pipeline on synthetic projects of several scales.
+
+Each stage (project discovery, data types loading, SLWD parsing, symbols expansion and export) is timed
+on a freshly generated solution, then run once more under tracemalloc to get its peak memory.
+Results can be saved as JSON and compared with a previous run to spot regressions.
+
+Usage: python benchmarks/run_benchmarks.py [--scales small medium] [--json results.json] [--baseline previous.json]
+"""
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from synthetic_solution import SolutionSpec, generate_solution, generate_solutions
+from sysmac_solution import PUBLICATION_VALUES, SysmacSolution, get_solutions
+from utils import export_symbols_to_file, parse_slwd, read_slwd
+
+
+# Scale name -> (spec of the benchmarked project, number of projects in the solution directory)
+SCALES = {
+    'small': (SolutionSpec(global_count=1000, struct_count=20, nesting_depth=2, array_size=10), 20),
+    'medium': (SolutionSpec(global_count=5000, struct_count=50, nesting_depth=3, array_size=5,
+                            namespace_count=3), 100),
+    'large': (SolutionSpec(global_count=20000, struct_count=100, nesting_depth=3, array_size=4,
+                           namespace_count=5), 300),
+}
+
+# A stage is reported as a regression when it is slower than the baseline by more than this ratio
+REGRESSION_THRESHOLD = 1.2
+
+
+def prepare_solution(solutions_path: Path, spec: SolutionSpec, project_count: int) -> str:
+    """ Write the benchmarked project along with small projects so that the discovery has something to scan """
+    uuid = generate_solution(solutions_path, 'Benchmark', spec)
+    generate_solutions(solutions_path, project_count - 1, SolutionSpec(global_count=10, seed=spec.seed + 1))
+    return uuid
+
+
+def get_stages(solutions_path: Path, uuid: str, output_file: Path):
+    solution = SysmacSolution(solutions_path, uuid)
+    global_vars_file = solutions_path / uuid / f'{solution.manifest.global_variables.id}.xml'
+    symbols = solution.get_published_symbols()
+    return {
+        'get_solutions': lambda: get_solutions(solutions_path),
+        'get_data_types': lambda: SysmacSolution(solutions_path, uuid).get_data_types(),
+        'parse_slwd': lambda: parse_slwd(global_vars_file),
+        'read_slwd (published)': lambda: read_slwd(global_vars_file, {'NTP': PUBLICATION_VALUES}),
+        'get_published_symbols': lambda: SysmacSolution(solutions_path, uuid).get_published_symbols(),
+        'export_symbols_to_file': lambda: export_symbols_to_file(symbols, output_file),
+    }, len(symbols)
+
+
+def measure(func, repeat: int):
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(durations), peak
+
+
+def run(scales, repeat: int):
+    results = {}
+    for scale in scales:
+        spec, project_count = SCALES[scale]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            solutions_path = Path(tmp_dir) / 'Solution'
+            uuid = prepare_solution(solutions_path, spec, project_count)
+            stages, symbol_count = get_stages(solutions_path, uuid, Path(tmp_dir) / 'symbols.txt')
+            print(f'{scale}: {spec.global_count} global variables, {symbol_count} symbols, {project_count} projects')
+            results[scale] = {'symbols': symbol_count, 'stages': {}}
+            for name, func in stages.items():
+                duration, peak = measure(func, repeat)
+                results[scale]['stages'][name] = {'duration': duration, 'peak_memory': peak}
+                print(f'  {name:<24} {duration * 1e3:>10.1f} ms  {peak / 2 ** 20:>8.1f} MiB')
+    return results
+
+
+def compare(results, baseline) -> int:
+    regressions = 0
+    for scale, scale_results in results.items():
+        for name, stage in scale_results['stages'].items():
+            reference = baseline.get(scale, {}).get('stages', {}).get(name)
+            if reference is None:
+                continue
+            ratio = stage['duration'] / reference['duration']
+            if ratio > REGRESSION_THRESHOLD:
+                regressions += 1
+                print(f'REGRESSION {scale}/{name}: {reference["duration"] * 1e3:.1f} ms -> '
+                      f'{stage["duration"] * 1e3:.1f} ms (x{ratio:.2f})')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', nargs='+', choices=SCALES.keys(), default=['small', 'medium'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help='Save the results to that file')
+    parser.add_argument('--baseline', help='Results of a previous run to compare with')
+    args = parser.parse_args(argv)
+
+    results = run(args.scales, args.repeat)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding='utf-8')
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        return 1 if compare(results, baseline) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Generator of synthetic Sysmac Studio projects, used by the benchmarks.
+
+Each project is made of the files read by SysmacSymbolExport:
+ - <uuid>.xml: project properties
+ - <uuid>.oem: entities of the project, referring to the other files
+ - one DataType file per namespace, with STRUCT (nested up to the configured depth) and ENUM definitions
+ - the SLWD file of the global variables
+
+Usage: python benchmarks/synthetic_solution.py <solutions_path> [--projects 10] [--globals 1000] ...
+"""
+import argparse
+import random
+import uuid as uuid_lib
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from xml.sax.saxutils import quoteattr
+
+
+DATATYPE_ATTRIBUTES = ('ArrayType', 'Length', 'InitialValue', 'EnumValue', 'Comment', 'OffsetChannel',
+                       'OffsetBit', 'IsControllerDefinedType', 'Order', 'OffsetType')
+LEAF_TYPES = ('BOOL', 'INT', 'DINT', 'REAL', 'LREAL', 'WORD', 'STRING', 'ARRAY[0..7] OF BYTE')
+# Controller-defined types which can be used as STRUCT members
+INTERNAL_TYPES = ('_sAXIS_REF_STA', '_sMC_REF_EVENT')
+PUBLISH_VALUES = ('PublicationOnly', 'PublicationInput', 'PublicationOutput')
+
+
+@dataclass
+class SolutionSpec:
+    global_count: int = 100
+    published_ratio: float = 0.5
+    namespace_count: int = 1
+    struct_count: int = 10
+    struct_members: int = 8
+    nesting_depth: int = 2
+    array_size: int = 10
+    enum_count: int = 2
+    seed: int = 0
+
+
+def _datatype(name, base_type, comment='', children=None, indent='    '):
+    attributes = {'Name': name, 'BaseType': base_type}
+    attributes |= {a: '' for a in DATATYPE_ATTRIBUTES}
+    attributes['Comment'] = comment
+    attributes['IsControllerDefinedType'] = 'false'
+    attributes['Order'] = '0'
+    attrs = ' '.join(f'{k}={quoteattr(v)}' for k, v in attributes.items())
+    if not children:
+        return f'{indent}<DataType {attrs} />\n'
+    return f'{indent}<DataType {attrs}>\n{"".join(children)}{indent}</DataType>\n'
+
+
+def _write_namespace(path: Path, spec: SolutionSpec, namespace, rnd: random.Random):
+    """ Write a namespace DataType file. Returns the fully qualified STRUCT and ENUM names. """
+    prefix = f'{namespace}\\' if namespace else ''
+    definitions = []
+    enums = []
+    for i in range(spec.enum_count):
+        name = f'eState{i}'
+        members = [_datatype(f'{name}_V{v}', 'ENUM', children=None, indent='      ') for v in range(4)]
+        definitions.append(_datatype(name, 'ENUM', comment=f'Enum {i}', children=members))
+        enums.append(f'{prefix}{name}')
+
+    # Structs are split in levels: level 0 only has leaf members,
+    # level n structs can reference level n-1 structs (directly or through arrays)
+    structs = []
+    levels = max(spec.nesting_depth, 1)
+    per_level = max(spec.struct_count // levels, 1)
+    previous_level = []
+    for level in range(levels):
+        current_level = []
+        for i in range(per_level):
+            name = f'sType{level}_{i}'
+            members = []
+            for m in range(spec.struct_members):
+                choice = rnd.random()
+                if previous_level and choice < 0.2:
+                    base_type = rnd.choice(previous_level)
+                elif previous_level and choice < 0.3:
+                    base_type = f'ARRAY[0..{spec.array_size - 1}] OF {rnd.choice(previous_level)}'
+                elif enums and choice < 0.4:
+                    base_type = rnd.choice(enums)
+                elif choice < 0.45:
+                    base_type = rnd.choice(INTERNAL_TYPES)
+                else:
+                    base_type = rnd.choice(LEAF_TYPES)
+                members.append(_datatype(f'Member{m}', base_type, comment=f'Member {m} of {name}', indent='      '))
+            definitions.append(_datatype(name, 'STRUCT', comment=f'Struct {name}', children=members))
+            current_level.append(f'{prefix}{name}')
+        structs.extend(current_level)
+        previous_level = current_level
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<Data>\n  <Body>\n')
+        f.writelines(definitions)
+        f.write('  </Body>\n</Data>\n')
+    return structs, enums
+
+
+def _write_globals(path: Path, spec: SolutionSpec, structs, enums, rnd: random.Random):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('++H=SLWD\tVersion=1.0\n')
+        for i in range(spec.global_count):
+            choice = rnd.random()
+            if structs and choice < 0.3:
+                data_type = rnd.choice(structs)
+            elif structs and choice < 0.4:
+                data_type = f'ARRAY[0..{spec.array_size - 1}] OF {rnd.choice(structs)}'
+            elif enums and choice < 0.45:
+                data_type = rnd.choice(enums)
+            else:
+                data_type = rnd.choice(LEAF_TYPES)
+            fields = [f'N=gVar{i}']
+            if rnd.random() < spec.published_ratio:
+                fields.append(f'NTP={rnd.choice(PUBLISH_VALUES)}')
+            else:
+                fields.append('NTP=DoNotPublish')
+            fields.append('IV=')
+            fields.append(f'Com=Global variable {i}$t$t$t$tGroup{i % 5}')
+            f.write(f'++D={data_type}\t' + '\t'.join(fields) + '\n')
+
+
+def generate_solution(solutions_path, name: str, spec: SolutionSpec = SolutionSpec(), uuid: str = None) -> str:
+    """ Write a synthetic Sysmac project in the solutions directory and return its UUID """
+    rnd = random.Random(spec.seed)
+    uuid = uuid or str(uuid_lib.UUID(int=rnd.getrandbits(128)))
+    project_dir = Path(solutions_path) / uuid
+    project_dir.mkdir(parents=True, exist_ok=True)
+
+    date_modified = datetime(2025, 1, 1) + timedelta(minutes=rnd.randrange(500000))
+    with open(project_dir / f'{uuid}.xml', 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                '<ProjectProperties>\n'
+                '  <ProjectType>StandardProject</ProjectType>\n'
+                '  <Author>Synthetic</Author>\n'
+                f'  <DateModified>{date_modified.isoformat()}</DateModified>\n'
+                '</ProjectProperties>\n')
+
+    structs, enums = [], []
+    datatype_entities = []
+    for n in range(spec.namespace_count):
+        namespace = f'Ns{n}' if n > 0 else None
+        datatype_id = str(uuid_lib.UUID(int=rnd.getrandbits(128)))
+        ns_structs, ns_enums = _write_namespace(project_dir / f'{datatype_id}.xml', spec, namespace, rnd)
+        structs.extend(ns_structs)
+        enums.extend(ns_enums)
+        ns_attr = f' namespace="{namespace}"' if namespace else ''
+        datatype_entities.append(f'          <Entity type="DataType" id="{datatype_id}"{ns_attr} name="DataTypes" />\n')
+
+    global_vars_id = str(uuid_lib.UUID(int=rnd.getrandbits(128)))
+    _write_globals(project_dir / f'{global_vars_id}.xml', spec, structs, enums, rnd)
+
+    with open(project_dir / f'{uuid}.oem', 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<data>\n'
+                f'  <Entity type="Solution" id="{uuid}" name={quoteattr(name)}>\n'
+                '    <ChildEntities>\n'
+                '      <Entity type="Group" subtype="IecData" id="iec-data" name="Data">\n'
+                '        <ChildEntities>\n'
+                f'{"".join(datatype_entities)}'
+                f'          <Entity type="Variables" subtype="Global" id="{global_vars_id}" name="Global Variables" />\n'
+                '        </ChildEntities>\n'
+                '      </Entity>\n'
+                '    </ChildEntities>\n'
+                '  </Entity>\n'
+                '</data>\n')
+    return uuid
+
+
+def generate_solutions(solutions_path, count: int, spec: SolutionSpec = SolutionSpec()):
+    return [generate_solution(solutions_path, f'Project{i}', replace(spec, seed=spec.seed + i))
+            for i in range(count)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('solutions_path')
+    parser.add_argument('--projects', type=int, default=1)
+    parser.add_argument('--globals', type=int, default=SolutionSpec.global_count)
+    parser.add_argument('--structs', type=int, default=SolutionSpec.struct_count)
+    parser.add_argument('--namespaces', type=int, default=SolutionSpec.namespace_count)
+    parser.add_argument('--depth', type=int, default=SolutionSpec.nesting_depth)
+    parser.add_argument('--array-size', type=int, default=SolutionSpec.array_size)
+    args = parser.parse_args()
+    generate_solutions(args.solutions_path, args.projects,
+                       SolutionSpec(global_count=args.globals, struct_count=args.structs, namespace_count=args.namespaces,
+                                    nesting_depth=args.depth, array_size=args.array_size))
@@ -0,0 +1,239 @@
+import argparse
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, List
+
+from exporters import BUFFER_SIZE, EXPORTERS
+from instrumentation import profiling
+from progress import CancellationToken, ExportCancelled
+from solution_cache import SolutionCache
+from sysmac_solution import SysmacSolution, get_solutions
+from utils import export_symbols_to_file
+
+
+logger = logging.getLogger(__name__)
+
+# Timestamp of the archive entries: the archive content only depends on the exported symbols
+ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+@dataclass
+class ExportResult:
+    uuid: str
+    name: str
+    filename: str
+    symbol_count: int = 0
+    duration: float = 0.0
+    error: str = ''
+
+
+def select_solutions(solutions: List[SysmacSolution], selectors: List[str]) -> List[SysmacSolution]:
+    """ Keep the solutions matching one of the selectors (project UUID or glob on the project name) """
+    if not selectors:
+        return solutions
+    return [s for s in solutions
+            if any(s.uuid == selector or fnmatchcase(s.name, selector) for selector in selectors)]
+
+
+def get_output_filenames(solutions: List[SysmacSolution], extension: str = '.txt') -> List[str]:
+    # Several projects can share the same name (eg: copies of a project).
+    # The UUID is appended to these ones so that no export file is overwritten.
+    names = [re.sub(r'[<>:"/\\|?*]', '_', s.name) for s in solutions]
+    return [f'{name}_symbols{extension}' if names.count(name) == 1 else f'{name}_{s.uuid}_symbols{extension}'
+            for name, s in zip(names, solutions)]
+
+
+def export_solution(solutions_path, uuid: str, filename: str, cache_dir=None, sort=True, trace=False,
+                    export_format='weintek', export_options: Dict = None, max_tags: int = None) -> ExportResult:
+    """
+    Export the published symbols of a single project. Run in a worker process.
+    Without sorting, the symbols are written as they are expanded, in the declaration order.
+    With trace, the timings and memory peaks of the export stages are saved to <filename>.trace.json
+    With max_tags, the export fails before expanding the symbols if there would be more of them.
+    With cache_dir, the data parsed from the project files is cached there (see SolutionCache).
+    """
+    start = time.perf_counter()
+    result = ExportResult(uuid=uuid, name='', filename=filename)
+    try:
+        with profiling(trace_memory=trace) as profiler:
+            cache = SolutionCache(cache_dir) if cache_dir is not None else None
+            solution = SysmacSolution(solutions_path, uuid, cache=cache)
+            result.name = solution.name
+            # The tag limit is checked before the file is created
+            symbols = solution.iter_published_symbols(sort=sort, max_tags=max_tags)
+            result.symbol_count = export_symbols_to_file(symbols, filename, export_format, **(export_options or {}))
+        if trace:
+            profiler.report().dump_chrome_trace(f'{filename}.trace.json')
+    except Exception as e:
+        logger.exception(f'Export of project {uuid} failed')
+        result.error = f'{e.__class__.__name__}: {e}'
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def export_solutions(solutions_path, solutions: List[SysmacSolution], output_dir, max_workers=None,
+                     cache_dir=None, sort=True, trace=False, export_format='weintek',
+                     export_options: Dict = None, max_tags: int = None) -> List[ExportResult]:
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(export_solution, solutions_path, s.uuid, str(output_dir / filename),
+                            cache_dir, sort, trace, export_format, export_options, max_tags): s
+            for s, filename in zip(solutions, get_output_filenames(solutions, EXPORTERS[export_format].extension))
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            result.name = futures[future].name
+            logger.info(f'{result.name} ({result.uuid}) exported in {result.duration:.2f}s')
+            results.append(result)
+
+    # Keep the summary in the same order as the projects list whatever the completion order
+    order = {s.uuid: i for i, s in enumerate(solutions)}
+    return sorted(results, key=lambda r: order[r.uuid])
+
+
+def _add_to_archive(archive: zipfile.ZipFile, filename: str, arcname: str):
+    info = zipfile.ZipInfo(arcname, date_time=ARCHIVE_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.file_size = os.path.getsize(filename)  # Let zipfile know whether ZIP64 is required
+    with open(filename, 'rb') as src, archive.open(info, 'w') as dst:
+        shutil.copyfileobj(src, dst, BUFFER_SIZE)
+
+
+def export_solutions_to_archive(solutions_path, solutions: List[SysmacSolution], archive_path, max_workers=None,
+                                cache_dir=None, sort=True, export_format='weintek', export_options: Dict = None,
+                                executor_class=ProcessPoolExecutor, max_tags: int = None,
+                                cancel: CancellationToken = None) -> List[ExportResult]:
+    """
+    Export the projects concurrently into a single zip archive.
+
+    Each project is exported to a temporary file by a worker. A file is moved into the archive as soon as the
+    projects before it in the list are done, so the entries are in the order of the list whatever the completion
+    order. With the fixed entries timestamp, exporting the same projects twice gives the same archive.
+    The cancellation token is checked each time a project is done: the projects not started yet are cancelled,
+    the archive is removed and ExportCancelled is raised.
+    """
+    filenames = get_output_filenames(solutions, EXPORTERS[export_format].extension)
+    results: List[ExportResult | None] = [None] * len(solutions)
+    try:
+        with (tempfile.TemporaryDirectory() as tmp_dir,
+              executor_class(max_workers=max_workers) as executor,
+              zipfile.ZipFile(archive_path, 'w') as archive):
+            futures = {
+                executor.submit(export_solution, solutions_path, s.uuid, os.path.join(tmp_dir, filename),
+                                cache_dir, sort, False, export_format, export_options, max_tags): i
+                for i, (s, filename) in enumerate(zip(solutions, filenames))
+            }
+            next_index = 0
+            for future in as_completed(futures):
+                if cancel is not None and cancel.cancelled:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise ExportCancelled()
+                result = future.result()
+                result.name = solutions[futures[future]].name
+                logger.info(f'{result.name} ({result.uuid}) exported in {result.duration:.2f}s')
+                results[futures[future]] = result
+                while next_index < len(results) and results[next_index] is not None:
+                    result = results[next_index]
+                    if not result.error:
+                        _add_to_archive(archive, result.filename, filenames[next_index])
+                        os.remove(result.filename)
+                    result.filename = filenames[next_index]
+                    next_index += 1
+    except ExportCancelled:
+        Path(archive_path).unlink(missing_ok=True)
+        raise
+    return results
+
+
+def print_summary(results: List[ExportResult], total_duration: float, file=sys.stdout):
+    name_width = max([len('Project'), *(len(r.name) for r in results)])
+    print(f'{"Project":<{name_width}}  {"UUID":<36}  {"Symbols":>9}  {"Time (s)":>8}  Status', file=file)
+    for r in results:
+        status = f'FAILED ({r.error})' if r.error else r.filename
+        print(f'{r.name:<{name_width}}  {r.uuid:<36}  {r.symbol_count:>9}  {r.duration:>8.2f}  {status}', file=file)
+
+    failed = sum(1 for r in results if r.error)
+    symbol_count = sum(r.symbol_count for r in results)
+    print(f'{len(results) - failed}/{len(results)} projects exported, '
+          f'{symbol_count} symbols in {total_duration:.2f}s', file=file)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Export the published global variables of Sysmac Studio projects without the GUI.'
+    )
+    parser.add_argument('solutions_path', help='Solution directory (eg: C:\\OMRON\\Data\\Solution)')
+    parser.add_argument('projects', nargs='*',
+                        help='Project UUIDs or project name glob patterns. All the projects are exported if omitted.')
+    parser.add_argument('-o', '--output-dir', default='.',
+                        help='Directory where the symbols files are written (default: current directory)')
+    parser.add_argument('-a', '--archive',
+                        help='Write the symbols files into that zip archive instead of the output directory')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='Number of worker processes (default: number of CPUs)')
+    parser.add_argument('-f', '--format', choices=EXPORTERS.keys(), default='weintek',
+                        help='Format of the symbols files: ' +
+                             ', '.join(f'{name} ({cls.description})' for name, cls in EXPORTERS.items()))
+    parser.add_argument('--columns', default='name,type,comment',
+                        help='Comma separated columns of the csv format, among name, type and comment')
+    parser.add_argument('--delimiter', default=',', help='Delimiter of the csv format')
+    parser.add_argument('--max-tags', type=int,
+                        help='Fail the export of the projects which would produce more tags than that, '
+                             'eg: the tag limit of the HMI. The tags are counted before being expanded.')
+    parser.add_argument('--cache-dir',
+                        help='Directory where the data parsed from the project files is cached between exports. '
+                             'The project files are parsed again on each export if omitted.')
+    parser.add_argument('--declaration-order', action='store_true',
+                        help='Write the symbols in the declaration order of the global variables instead of sorting '
+                             'them by name. Symbols are then streamed to the file without being kept in memory.')
+    parser.add_argument('--trace', action='store_true',
+                        help='Save the duration and the memory peak of each export stage to a Chrome trace file '
+                             '(<symbols file>.trace.json), to be opened with chrome://tracing or Perfetto')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show debug messages')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    start = time.perf_counter()
+    solutions = [s for s in get_solutions(args.solutions_path) if s.name != '']
+    solutions = select_solutions(solutions, args.projects)
+    if not solutions:
+        print(f'No project found in {args.solutions_path}', file=sys.stderr)
+        return 1
+
+    export_options = {}
+    if args.format == 'csv':
+        export_options = {'columns': args.columns.split(','), 'delimiter': args.delimiter}
+    if args.archive:
+        results = export_solutions_to_archive(args.solutions_path, solutions, args.archive, max_workers=args.jobs,
+                                              cache_dir=args.cache_dir, sort=not args.declaration_order,
+                                              export_format=args.format, export_options=export_options,
+                                              max_tags=args.max_tags)
+    else:
+        results = export_solutions(args.solutions_path, solutions, args.output_dir, max_workers=args.jobs,
+                                   cache_dir=args.cache_dir, sort=not args.declaration_order, trace=args.trace,
+                                   export_format=args.format, export_options=export_options,
+                                   max_tags=args.max_tags)
+    print_summary(results, time.perf_counter() - start)
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import csv
+import struct
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Sequence, Tuple, Type
+
+
+# (name, base type, comment) of an exported symbol
+Row = Tuple[str, str, str | None]
+
+# Write buffer size of the export files
+BUFFER_SIZE = 1 << 16
+
+
+class SymbolExporter(ABC):
+    """
+    Base class of the export formats.
+
+    An exporter writes the rows as they are produced by the iterable, without holding them in memory,
+    so that the symbols can be streamed from the expansion to the file. Options are given to the constructor.
+    """
+    name: str = ''
+    extension: str = ''
+    description: str = ''
+
+    @abstractmethod
+    def export(self, rows: Iterable[Row], filename) -> int:
+        """ Write the rows to the file. Returns the number of rows written. """
+
+
+EXPORTERS: Dict[str, Type[SymbolExporter]] = {}
+
+
+def register_exporter(cls: Type[SymbolExporter]) -> Type[SymbolExporter]:
+    EXPORTERS[cls.name] = cls
+    return cls
+
+
+def get_exporter(export_format: str, **options) -> SymbolExporter:
+    try:
+        return EXPORTERS[export_format](**options)
+    except KeyError:
+        raise ValueError(f'Unknown export format "{export_format}". '
+                         f'Available formats are: {", ".join(EXPORTERS)}') from None
+
+
+def format_from_filename(filename, default: str = 'weintek') -> str:
+    """ Export format matching the extension of a file, eg: 'jsonl' for 'symbols.jsonl' """
+    suffix = Path(filename).suffix.lower()
+    for name, cls in EXPORTERS.items():
+        if cls.extension == suffix:
+            return name
+    return default
+
+
+class _CountedRows:
+    """ Counts the rows while they are consumed """
+    def __init__(self, rows: Iterable):
+        self._rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self._rows:
+            self.count += 1
+            yield row
+
+
+@register_exporter
+class WeintekExporter(SymbolExporter):
+    """ Tags file to be imported in Weintek EasyBuilder Pro """
+    name = 'weintek'
+    extension = '.txt'
+    description = 'Weintek EasyBuilder tags (tab-separated)'
+    fieldnames = ['HOST', 'NAME', 'DATATYPE', 'ADDRESS', 'COMMENT', 'TAGLINK', 'RW', 'POU']
+
+    def export(self, rows: Iterable[Row], filename) -> int:
+        counted_rows = _CountedRows(rows)
+        # From Weintek documentation, the file should be in ANSI format. Hence, the CP1252 encoding
+        with open(filename, 'w', newline='', encoding='cp1252', buffering=BUFFER_SIZE) as f:
+            writer = csv.writer(f, delimiter='\t')
+            writer.writerow(self.fieldnames)
+            writer.writerows(('', name, base_type, '', comment, 'TRUE', 'RW', '')
+                             for name, base_type, comment in counted_rows)
+        return counted_rows.count
+
+
+@register_exporter
+class JsonLinesExporter(SymbolExporter):
+    """ One JSON object per line: {"name": ..., "type": ..., "comment": ...} """
+    name = 'jsonl'
+    extension = '.jsonl'
+    description = 'JSON Lines'
+
+    def export(self, rows: Iterable[Row], filename) -> int:
+        counted_rows = _CountedRows(rows)
+        # Same output as json.dumps() on each row, without building a dict per row
+        quote = encode_basestring
+        with open(filename, 'w', newline='\n', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+            f.writelines(f'{{"name": {quote(name)}, "type": {quote(base_type)}, '
+                         f'"comment": {"null" if comment is None else quote(comment)}}}\n'
+                         for name, base_type, comment in counted_rows)
+        return counted_rows.count
+
+
+@register_exporter
+class CsvExporter(SymbolExporter):
+    """ Generic CSV file made of the chosen columns among name, type and comment """
+    name = 'csv'
+    extension = '.csv'
+    description = 'CSV'
+    column_indexes = {'name': 0, 'type': 1, 'comment': 2}
+
+    def __init__(self, columns: Sequence[str] = ('name', 'type', 'comment'), delimiter: str = ',',
+                 encoding: str = 'utf-8', header: bool = True):
+        unknown_columns = [c for c in columns if c not in self.column_indexes]
+        if unknown_columns or not columns:
+            raise ValueError(f'Invalid CSV columns {", ".join(unknown_columns)}. '
+                             f'Available columns are: {", ".join(self.column_indexes)}')
+        self.columns = list(columns)
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.header = header
+
+    def export(self, rows: Iterable[Row], filename) -> int:
+        counted_rows = _CountedRows(rows)
+        indexes = [self.column_indexes[c] for c in self.columns]
+        with open(filename, 'w', newline='', encoding=self.encoding, buffering=BUFFER_SIZE) as f:
+            writer = csv.writer(f, delimiter=self.delimiter)
+            if self.header:
+                writer.writerow(self.columns)
+            writer.writerows([row[i] for i in indexes] for row in counted_rows)
+        return counted_rows.count
+
+
+@register_exporter
+class ColumnarExporter(SymbolExporter):
+    """
+    Compact binary file, column by column, for downstream tooling. Read it back with read_columnar().
+
+    Little-endian layout: the b'SYMC' magic and a uint16 version, followed by blocks of at most block_size rows.
+    Each block is made of its uint32 row count, the types and comments met for the first time in that block,
+    the names, then the uint32 type and comment ids of each row. Types and comments are thus only stored once.
+    Lists of strings are stored as their uint32 count and byte length, then the UTF-8 strings separated by NUL.
+    A None comment has the id NULL_ID.
+    """
+    name = 'columnar'
+    extension = '.symc'
+    description = 'Binary columnar'
+    MAGIC = b'SYMC'
+    VERSION = 1
+    NULL_ID = 0xFFFFFFFF
+
+    def __init__(self, block_size: int = 65536):
+        self.block_size = block_size
+
+    def export(self, rows: Iterable[Row], filename) -> int:
+        count = 0
+        type_ids: Dict[str, int] = {}
+        comment_ids: Dict[str | None, int] = {None: self.NULL_ID}
+        with open(filename, 'wb', buffering=BUFFER_SIZE) as f:
+            f.write(self.MAGIC + struct.pack('<H', self.VERSION))
+            block = []
+            for row in rows:
+                block.append(row)
+                if len(block) == self.block_size:
+                    self._write_block(f, block, type_ids, comment_ids)
+                    count += len(block)
+                    block = []
+            if block:
+                self._write_block(f, block, type_ids, comment_ids)
+                count += len(block)
+        return count
+
+    @staticmethod
+    def _write_strings(f: BinaryIO, strings: List[str]):
+        data = '\0'.join(strings).encode('utf-8')
+        f.write(struct.pack('<II', len(strings), len(data)))
+        f.write(data)
+
+    def _write_block(self, f: BinaryIO, block: List[Row], type_ids: Dict, comment_ids: Dict):
+        new_types = []
+        new_comments = []
+        block_type_ids = array('I')
+        block_comment_ids = array('I')
+        for _, base_type, comment in block:
+            type_id = type_ids.get(base_type)
+            if type_id is None:
+                type_id = type_ids[base_type] = len(type_ids)
+                new_types.append(base_type)
+            block_type_ids.append(type_id)
+            comment_id = comment_ids.get(comment)
+            if comment_id is None:
+                # The NULL_ID entry of None is not counted
+                comment_id = comment_ids[comment] = len(comment_ids) - 1
+                new_comments.append(comment)
+            block_comment_ids.append(comment_id)
+
+        f.write(struct.pack('<I', len(block)))
+        self._write_strings(f, new_types)
+        self._write_strings(f, new_comments)
+        self._write_strings(f, [name for name, _, _ in block])
+        for ids in (block_type_ids, block_comment_ids):
+            if sys.byteorder == 'big':
+                ids.byteswap()
+            f.write(ids.tobytes())
+
+
+def read_columnar(filename) -> Iterator[Row]:
+    """ Read the rows of a file written by ColumnarExporter """
+    def read_strings(f) -> List[str]:
+        count, size = struct.unpack('<II', f.read(8))
+        return f.read(size).decode('utf-8').split('\0') if count else []
+
+    with open(filename, 'rb') as f:
+        header = f.read(6)
+        if header[:4] != ColumnarExporter.MAGIC:
+            raise ValueError(f'{filename} is not a columnar symbols file')
+        version, = struct.unpack('<H', header[4:])
+        if version != ColumnarExporter.VERSION:
+            raise ValueError(f'Unsupported columnar symbols file version {version}')
+
+        types: List[str] = []
+        comments: List[str] = []
+        while block_header := f.read(4):
+            row_count, = struct.unpack('<I', block_header)
+            types.extend(read_strings(f))
+            comments.extend(read_strings(f))
+            names = read_strings(f)
+            ids = array('I')
+            ids.frombytes(f.read(8 * row_count))
+            if sys.byteorder == 'big':
+                ids.byteswap()
+            for i, name in enumerate(names):
+                comment_id = ids[row_count + i]
+                yield name, types[ids[i]], None if comment_id == ColumnarExporter.NULL_ID else comments[comment_id]
@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass
+class StageReport:
+    name: str
+    calls: int = 0
+    duration: float = 0.0       # Including the nested stages
+    self_duration: float = 0.0  # Excluding the nested stages
+    peak_memory: int | None = None
+
+
+@dataclass
+class PipelineReport:
+    stages: Dict[str, StageReport] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    events: List[dict] = field(default_factory=list)
+
+    def summary(self, max_stages: int = 3) -> str:
+        """ Short description of the most time-consuming stages and of the counters """
+        stages = sorted(self.stages.values(), key=lambda s: s.self_duration, reverse=True)[:max_stages]
+        text = ', '.join(f'{s.name} {s.self_duration:.2f}s' for s in stages)
+        if self.counters:
+            text += ' | ' + ', '.join(f'{value} {name}' for name, value in self.counters.items())
+        return text
+
+    def to_chrome_trace(self) -> dict:
+        """ Events in the Trace Event Format, to be opened with chrome://tracing or Perfetto """
+        events = list(self.events)
+        if events:
+            end = max(e['ts'] + e['dur'] for e in events)
+            events.extend({'name': name, 'ph': 'C', 'ts': end, 'pid': os.getpid(), 'tid': 0, 'args': {name: value}}
+                          for name, value in self.counters.items())
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump_chrome_trace(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+class _Frame:
+    __slots__ = ('name', 'start', 'children_duration', 'peak_memory')
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.children_duration = 0.0
+        self.peak_memory = 0
+
+
+class Profiler:
+    """
+    Collects named stage timings and counters of the export pipeline.
+
+    Stages can be nested. When trace_memory is enabled, the tracemalloc peak of each stage is recorded as well.
+    The profiler is made active for the current thread with the profiling() context manager,
+    instrumented code gets it with get_profiler().
+    """
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self._report = PipelineReport()
+        self._stack: List[_Frame] = []
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.trace_memory:
+            self._update_peaks()
+            tracemalloc.reset_peak()
+        frame = _Frame(name, time.perf_counter())
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+            duration = end - frame.start
+            stage = self._report.stages.setdefault(name, StageReport(name))
+            stage.calls += 1
+            stage.duration += duration
+            stage.self_duration += duration - frame.children_duration
+            if self._stack:
+                self._stack[-1].children_duration += duration
+
+            args = {}
+            if self.trace_memory:
+                frame.peak_memory = max(frame.peak_memory, tracemalloc.get_traced_memory()[1])
+                for parent in self._stack:
+                    parent.peak_memory = max(parent.peak_memory, frame.peak_memory)
+                stage.peak_memory = max(stage.peak_memory or 0, frame.peak_memory)
+                args['peak_memory'] = frame.peak_memory
+            self._report.events.append({
+                'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                'ts': (frame.start - self._origin) * 1e6, 'dur': duration * 1e6, 'args': args
+            })
+
+    def _update_peaks(self):
+        # reset_peak() is about to be called: keep the peak reached so far by the running stages
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame.peak_memory = max(frame.peak_memory, peak)
+
+    def count(self, name: str, value: int = 1):
+        self._report.counters[name] = self._report.counters.get(name, 0) + value
+
+    def report(self) -> PipelineReport:
+        return self._report
+
+
+class _NullProfiler:
+    """ Used when no profiling is active: instrumentation costs a method call """
+    trace_memory = False
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+
+_NULL_PROFILER = _NullProfiler()
+_current_profiler: ContextVar[Profiler | _NullProfiler] = ContextVar('profiler', default=_NULL_PROFILER)
+
+
+def get_profiler() -> Profiler | _NullProfiler:
+    return _current_profiler.get()
+
+
+@contextmanager
+def profiling(trace_memory: bool = False):
+    """ Profile the export pipeline code run within the block, eg: `with profiling() as profiler: ...` """
+    profiler = Profiler(trace_memory=trace_memory)
+    start_tracing = trace_memory and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    token = _current_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _current_profiler.reset(token)
+        if start_tracing:
+            tracemalloc.stop()
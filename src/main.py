@@ -6,12 +6,11 @@ from tkinter.filedialog import askdirectory, askopenfilename, asksaveasfilename
 from tkinter import ttk
 
 from settings_manager import SettingsManager
+from solution_discovery import ProjectIndex
 from src import __version__, APP_NAME
 from ui import ProjectsTreeview
 from ui import StatusBar
 from ui import SymbolsDialog
-from ui import WorkerThread
-from utils import resource_path
 
 
 logger = logging.getLogger(__name__)
@@ -27,14 +26,15 @@ class AppUi(tk.Tk):
         self.task_queue = queue.Queue()
         self.result_queue = queue.Queue()
 
-        # Worker to handle time-consuming tasks in order to keep the UI responsive
-        self.worker = WorkerThread(self.task_queue, self.result_queue)
-        self.worker.start()
-
         self.settings = SettingsManager()
+        # Projects found on last run
+        self.project_index = ProjectIndex.load(self.settings.project_index_file)
+        # Workers to handle time-consuming tasks, started once the window is displayed (see _start_worker)
+        self.worker = None
 
         # UI
         if "__compiled__" in globals():
+            from utils import resource_path
             iconbitmap = resource_path('SysmacSymbolExport.ico')
         else:
             iconbitmap = '../SysmacSymbolExport.ico'
@@ -66,6 +66,17 @@ class AppUi(tk.Tk):
 
         self.__check_result_queue()
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.after_idle(self._start_worker)
+
+    def _start_worker(self):
+        # Importing the export pipeline takes time: it is done after the first paint of the window.
+        # The tasks queued until then are run as soon as the workers are started.
+        from ui import TaskExecutor
+        self.worker = TaskExecutor(self.task_queue, self.result_queue, max_workers=self.settings.get_worker_count(),
+                                   project_index=self.project_index,
+                                   project_index_file=self.settings.project_index_file,
+                                   max_tags=self.settings.get_max_tags(), cache_dir=self.settings.cache_dir)
+        self.worker.start()
 
     def add_menu_bar(self):
         menu_bar = tk.Menu(self)
@@ -74,6 +85,9 @@ class AppUi(tk.Tk):
         menu_file.add_command(label="Import settings", command=self.do_import_settings)
         menu_file.add_command(label="Export settings", command=self.do_export_settings)
         menu_file.add_command(label="Restore default settings", command=self.do_restore_settings)
+        menu_file.add_command(label="Clear cache", command=self.do_clear_cache)
+        menu_file.add_separator()
+        menu_file.add_command(label="Export selected projects", command=self.do_export_projects)
         menu_file.add_separator()
         menu_file.add_command(label="Exit", command=self.on_closing)
         menu_bar.add_cascade(label="File", menu=menu_file)
@@ -107,6 +121,29 @@ class AppUi(tk.Tk):
                    f"Follow on GitHub: https://github.com/LoicGRENON/SysmacSymbolExport")
         showinfo(f"About {APP_NAME}", content)
 
+    def do_clear_cache(self):
+        from solution_cache import SolutionCache
+        SolutionCache(self.settings.cache_dir).clear()
+        self.status_bar.set_text('Cache cleared')
+
+    def do_export_projects(self):
+        uuids = [self.projects_tv.item(iid, "text") for iid in self.projects_tv.selection()]
+        if not uuids:
+            self.status_bar.set_text('Select the projects to export first (Ctrl+click or Shift+click)')
+            return
+        filename = asksaveasfilename(
+            title='Please choose the archive to export the selected projects to',
+            initialfile='symbols.zip',
+            defaultextension='.zip',
+            filetypes=[('zip files', '.zip'), ('All files', '.*')]
+        )
+        if filename:
+            # Schedule work for TaskExecutor
+            command = 'export_projects_to_archive'
+            cmd_args = (self.path_entry_var.get(), uuids, filename)
+            self.task_queue.put((command, cmd_args))
+            self.status_bar.set_text(f'Exporting {len(uuids)} projects to {filename}. Please wait ...')
+
     def do_import_settings(self):
         askopenfile_title = "Please choose the file you want to import the settings from"
         askopenfile_filetypes = [('ini files', '.ini'), ('All files', '.*')]
@@ -135,7 +172,12 @@ class AppUi(tk.Tk):
     def load_from_settings(self):
         self.path_entry_var.set(self.settings.get('general', 'solution_path'))
 
-        # Schedule work for WorkerThread
+        # Display the projects found on last run while the directory is scanned again
+        summaries = self.project_index.summaries(self.path_entry_var.get())
+        if summaries:
+            self.projects_tv.update_projects(summaries)
+
+        # Schedule work for TaskExecutor
         command = 'get_solutions'
         cmd_args = (self.path_entry_var.get(),)
         self.task_queue.put((command, cmd_args))
@@ -149,7 +191,7 @@ class AppUi(tk.Tk):
         if input_path:
             self.path_entry_var.set(input_path)
 
-            # Schedule work for WorkerThread
+            # Schedule work for TaskExecutor
             command = 'get_solutions'
             cmd_args = (input_path,)
             self.task_queue.put((command, cmd_args))
@@ -165,16 +207,38 @@ class AppUi(tk.Tk):
                 if message == 'get_solutions':
                     self.projects_tv.update_projects(data)
                     self.status_bar.set_text(f'{len(data)} projects found')
+                elif message == 'estimate_symbols':
+                    self.projects_tv.set_tag_count(data['uuid'], data['count'])
+                elif message == 'progress':
+                    if data['command'] == 'get_vars_from_solution':
+                        self.status_bar.set_text(f'Retrieving variables: {data["progress"]}')
                 elif message == 'get_vars_from_solution':
+                    self.status_bar.hide_cancel_button()
                     solution = data['solution']
                     symbols = data['symbols']
-                    self.status_bar.set_text(f'{len(symbols)} symbols found from project {solution.name}')
+                    self.status_bar.set_text(f'{len(symbols)} symbols found from project {solution.name} '
+                                             f'({data["report"].summary()})')
                     self.projects_tv.enable_selection()
-                    self.symbols_dialog = SymbolsDialog(self, solution, symbols, self.task_queue)
+                    self.symbols_dialog = SymbolsDialog(self, solution, symbols, self.task_queue, index=data['index'])
                 elif message == 'save_symbols_to_file':
                     solution = data['solution']
                     filename = data['filename']
-                    self.status_bar.set_text(f'Symbols from project {solution.name} saved to {filename}')
+                    self.status_bar.set_text(f'Symbols from project {solution.name} saved to {filename} '
+                                             f'({data["report"].summary()})')
+                elif message == 'export_projects_to_archive':
+                    results = data['results']
+                    failed = [r.name for r in results if r.error]
+                    text = f'{len(results) - len(failed)}/{len(results)} projects exported to {data["filename"]}'
+                    if failed:
+                        text += f' (failed: {", ".join(failed)})'
+                    self.status_bar.set_text(text)
+                elif message == 'error':
+                    if data['command'] == 'estimate_symbols':
+                        # Not worth interrupting the user: the error is reported if the project is opened
+                        continue
+                    self.status_bar.hide_cancel_button()
+                    self.status_bar.set_text(f'Error while running {data["command"]}: {data["error"]}')
+                    self.projects_tv.enable_selection()
 
         except queue.Empty:
             pass
@@ -197,6 +261,12 @@ class AppUi(tk.Tk):
         project_uuid = self.projects_tv.item(tv_selection[0], "text")
         self.status_bar.set_text(f'{project_name}: {project_uuid}')
 
+        # Count the tags of the project without expanding its variables
+        if len(tv_selection) == 1 and self.projects_tv.get_tag_count(project_uuid) is None:
+            command = 'estimate_symbols'
+            cmd_args = (self.path_entry_var.get(), project_uuid)
+            self.task_queue.put((command, cmd_args))
+
     def on_project_tv_double_click(self, event):
         tv_selection = self.projects_tv.selection()
         if not tv_selection:
@@ -206,13 +276,20 @@ class AppUi(tk.Tk):
         project_name = selected_item_values[0]
         self.status_bar.set_text(f'Retrieving variables for project {project_name}. Please wait ...')
 
-        # Schedule work for WorkerThread
+        # Schedule work for TaskExecutor
         solutions_path = self.path_entry_var.get()
         project_uuid = self.projects_tv.item(tv_selection[0], "text")
         command = 'get_vars_from_solution'
         cmd_args = (solutions_path, project_uuid)
         self.task_queue.put((command, cmd_args))
         self.projects_tv.disable_selection()
+        self.status_bar.show_cancel_button(self.cancel_get_vars)
+
+    def cancel_get_vars(self):
+        self.task_queue.put(('cancel', 'get_vars_from_solution'))
+        self.status_bar.hide_cancel_button()
+        self.status_bar.set_text('Retrieving variables cancelled')
+        self.projects_tv.enable_selection()
 
 
 if __name__ == '__main__':
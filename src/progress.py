@@ -0,0 +1,66 @@
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable
+
+
+class ExportCancelled(Exception):
+    """ Raised by the export pipeline when its CancellationToken has been cancelled """
+
+
+class CancellationToken:
+    """ Cancellation request shared between the thread running an export and the one which may cancel it """
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise ExportCancelled()
+
+
+@dataclass
+class Progress:
+    files_parsed: int = 0
+    globals_done: int = 0
+    globals_total: int = 0
+    symbols: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def symbols_per_second(self) -> float:
+        return self.symbols / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f'{self.globals_done}/{self.globals_total} global variables, {self.symbols} symbols '
+                f'({self.symbols_per_second:.0f} symbols/s)')
+
+
+class ProgressReporter:
+    """
+    Collects the progress of an export and passes a copy of it to a callback.
+    The callback is called at most once every interval seconds, except for the final report.
+    """
+    def __init__(self, callback: Callable[[Progress], None], interval: float = 0.2):
+        self.callback = callback
+        self.interval = interval
+        self.progress = Progress()
+        self._start = time.perf_counter()
+        self._last_report = None
+
+    def file_parsed(self):
+        self.progress.files_parsed += 1
+        self.report()
+
+    def report(self, force: bool = False):
+        now = time.perf_counter()
+        if force or self._last_report is None or now - self._last_report >= self.interval:
+            self._last_report = now
+            self.progress.elapsed = now - self._start
+            self.callback(replace(self.progress))
@@ -1,7 +1,7 @@
 import configparser
 import logging
 import shutil
-from platformdirs import user_config_dir
+from platformdirs import user_cache_dir, user_config_dir
 from pathlib import Path
 
 from src import APP_NAME
@@ -9,11 +9,21 @@ from src import APP_NAME
 
 logger = logging.getLogger(__name__)
 
+# Number of tasks (projects loading, exports, ...) run concurrently by the UI
+DEFAULT_WORKER_COUNT = 4
+
+# Maximum number of tags of an export, 0 for no limit
+DEFAULT_MAX_TAGS = 0
+
 
 class SettingsManager:
     def __init__(self, config_filename: str = "config.ini"):
         self.config_dir = Path(user_config_dir(APP_NAME))
         self.config_file = self.config_dir / config_filename
+        # Projects found on last run, displayed while the solution directory is scanned again
+        self.project_index_file = self.config_dir / 'projects.json'
+        # Data parsed from the projects files (see SolutionCache)
+        self.cache_dir = Path(user_cache_dir(APP_NAME)) / 'solutions'
         logger.info(f"Config file: {self.config_file}")
         self.config = configparser.ConfigParser()
 
@@ -29,7 +39,9 @@ class SettingsManager:
 
     def restore_default(self):
         self.config['general'] = {
-            'solution_path': 'C:\\OMRON\\Data\\Solution'
+            'solution_path': 'C:\\OMRON\\Data\\Solution',
+            'worker_count': str(DEFAULT_WORKER_COUNT),
+            'max_tags': str(DEFAULT_MAX_TAGS)
         }
         self.save()
 
@@ -43,6 +55,22 @@ class SettingsManager:
     def get(self, section: str, key: str, fallback=None):
         return self.config.get(section, key, fallback=fallback)
 
+    def get_worker_count(self) -> int:
+        try:
+            return max(1, self.config.getint('general', 'worker_count', fallback=DEFAULT_WORKER_COUNT))
+        except ValueError:
+            logger.warning('Invalid worker_count setting, using the default value')
+            return DEFAULT_WORKER_COUNT
+
+    def get_max_tags(self) -> int | None:
+        """ Maximum number of tags of an export (eg: the tag limit of the HMI), None for no limit """
+        try:
+            max_tags = self.config.getint('general', 'max_tags', fallback=DEFAULT_MAX_TAGS)
+        except ValueError:
+            logger.warning('Invalid max_tags setting, the number of tags is not limited')
+            return None
+        return max_tags if max_tags > 0 else None
+
     def set(self, section: str, key: str, value: str):
         if section not in self.config:
             self.config.add_section(section)
@@ -0,0 +1,96 @@
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+# To be incremented each time the layout of the cached objects changes
+CACHE_VERSION = 3
+
+def file_digest(file_path) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'blake2b').hexdigest()
+
+
+def file_signature(file_path):
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class SolutionCache:
+    """
+    On-disk cache of the data parsed from a Sysmac project (data types, global variables, ...).
+
+    Each entry records the files it has been built from. An entry is invalidated as soon as one of these files
+    has been modified. When only the modification time of a file changed, its content hash is compared
+    so that the entry is kept if the content is identical.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+
+    def _entry_path(self, project_dir, key) -> Path:
+        project_id = hashlib.sha1(str(Path(project_dir).resolve()).encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f'{Path(project_dir).name}_{project_id}_{key}.pickle'
+
+    def get(self, project_dir, key):
+        """ Return the cached value or None if there is no valid entry for that key """
+        entry_path = self._entry_path(project_dir, key)
+        try:
+            with entry_path.open('rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'Unable to read cache entry {entry_path}: {e}')
+            return None
+
+        if entry.get('version') != CACHE_VERSION:
+            return None
+
+        dependencies_updated = False
+        for i, (file_path, signature, digest) in enumerate(entry['dependencies']):
+            try:
+                current_signature = file_signature(file_path)
+            except OSError:
+                logger.debug(f'Cache miss for {key} in {project_dir}: {file_path} is missing')
+                return None
+            if current_signature == signature:
+                continue
+            if file_digest(file_path) != digest:
+                logger.debug(f'Cache miss for {key} in {project_dir}: {file_path} has been modified')
+                return None
+            # Only the modification time changed: keep the entry and remember the new signature
+            entry['dependencies'][i] = (file_path, current_signature, digest)
+            dependencies_updated = True
+
+        if dependencies_updated:
+            self._write(entry_path, entry)
+        logger.debug(f'Cache hit for {key} in {project_dir}')
+        return entry['value']
+
+    def set(self, project_dir, key, value, dependencies):
+        """ Store a value built from the dependencies files """
+        entry = {
+            'version': CACHE_VERSION,
+            'dependencies': [(str(d), file_signature(d), file_digest(d)) for d in dependencies],
+            'value': value
+        }
+        self._write(self._entry_path(project_dir, key), entry)
+
+    def _write(self, entry_path: Path, entry):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so that concurrent readers never see a partial entry
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, entry_path)
+        except Exception as e:
+            logger.warning(f'Unable to write cache entry {entry_path}: {e}')
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
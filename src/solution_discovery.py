@@ -0,0 +1,259 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from os import PathLike
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+from progress import CancellationToken
+
+
+logger = logging.getLogger(__name__)
+
+PROPERTIES_TAGS = ('ProjectType', 'Author', 'DateModified')
+
+# Version of the saved project index format
+PROJECT_INDEX_VERSION = 1
+
+
+@dataclass
+class ProjectProperties:
+    name: str = ''
+    author: str = ''
+    project_type: str = ''
+    last_modified: datetime = field(default_factory=lambda: datetime.fromtimestamp(0))
+
+
+def _read_tags_text(file_path, tags) -> Dict[str, str]:
+    """ Get the text of the first element of each tag. Parsing stops as soon as all the tags have been found. """
+    found = {}
+    with open(file_path, 'rb') as f:
+        for _, elem in ET.iterparse(f, events=('end',)):
+            if elem.tag in tags and elem.tag not in found:
+                found[elem.tag] = elem.text or ''
+                if len(found) == len(tags):
+                    break
+    return found
+
+
+def _read_solution_name(oem_file) -> str:
+    """ Get the name of the Solution entity, which is declared at the very beginning of the .oem file """
+    with open(oem_file, 'rb') as f:
+        for _, elem in ET.iterparse(f, events=('start',)):
+            if elem.tag == 'Entity' and elem.get('type') == 'Solution':
+                return elem.get('name', '')
+    return ''
+
+
+def read_project_properties(project_dir, uuid: str) -> ProjectProperties | None:
+    """ Read the properties displayed in the projects list. Returns None if the directory is not a project. """
+    project_dir = Path(project_dir)
+    try:
+        tags = _read_tags_text(project_dir / f'{uuid}.xml', PROPERTIES_TAGS)
+    except FileNotFoundError:
+        return None
+
+    properties = ProjectProperties(author=tags.get('Author', ''), project_type=tags.get('ProjectType', ''))
+    if tags.get('DateModified'):
+        properties.last_modified = datetime.fromisoformat(tags['DateModified'])
+    try:
+        properties.name = _read_solution_name(project_dir / f'{uuid}.oem')
+    except (FileNotFoundError, ET.ParseError) as e:
+        logger.warning(f'Unable to read the name of project {uuid}: {e}')
+    return properties
+
+
+def _read_project(solutions_path, uuid: str) -> ProjectProperties | None:
+    try:
+        return read_project_properties(Path(solutions_path) / uuid, uuid)
+    except (OSError, ET.ParseError, ValueError) as e:
+        logger.warning(f'Unable to read the properties of project {uuid}: {e}')
+        return None
+
+
+def discover_projects(solutions_path: str | bytes | PathLike,
+                      max_workers: int = None) -> List[Tuple[str, ProjectProperties | None]]:
+    """ Read the properties of every project directory. Directories are scanned concurrently. """
+    uuids = [p.stem for p in Path(solutions_path).glob('*/')]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(zip(uuids, executor.map(lambda uuid: _read_project(solutions_path, uuid), uuids)))
+
+
+def _project_signature(project_dir: Path, uuid: str) -> Tuple:
+    """ Modification time and size of the files the project properties are read from """
+    signature = []
+    for filename in (f'{uuid}.xml', f'{uuid}.oem'):
+        try:
+            stat = (project_dir / filename).stat()
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class ProjectSummary(NamedTuple):
+    """ What the projects list displays of a project """
+    uuid: str
+    name: str
+    author: str
+    project_type: str
+    last_modified: datetime
+
+
+@dataclass
+class ProjectSnapshot:
+    signature: Tuple
+    properties: ProjectProperties | None
+
+
+@dataclass
+class ProjectChanges:
+    added: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+    modified: Set[str] = field(default_factory=set)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified)
+
+
+class ProjectIndex:
+    """
+    Properties of the projects of a solution directory, refreshed incrementally.
+
+    A snapshot of each project directory is kept along with the signature of the files its properties are
+    read from. On refresh, only the directories which have been added or whose files have been modified are read.
+
+    The index may be read by a thread while another one refreshes it: refresh() updates a copy of the snapshots,
+    which replaces them at once when it is done. A published snapshots dict is never modified afterwards.
+    A refresh is cancelled between two project directories: the index is left as it was.
+    """
+    def __init__(self):
+        self.solutions_path: Path | None = None
+        self.snapshots: Dict[str, ProjectSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def _published(self) -> Tuple[Path | None, Dict[str, ProjectSnapshot]]:
+        with self._lock:
+            return self.solutions_path, self.snapshots
+
+    def refresh(self, solutions_path: str | bytes | PathLike, max_workers: int = None,
+                cancel: CancellationToken = None) -> ProjectChanges:
+        solutions_path = Path(solutions_path)
+
+        def check_cancelled():
+            if cancel is not None:
+                cancel.check()
+
+        def signature(uuid):
+            check_cancelled()
+            return _project_signature(solutions_path / uuid, uuid)
+
+        def read_project(uuid):
+            check_cancelled()
+            return _read_project(solutions_path, uuid)
+
+        previous_path, previous_snapshots = self._published()
+        snapshots = dict(previous_snapshots) if solutions_path == previous_path else {}
+
+        changes = ProjectChanges()
+        uuids = [p.stem for p in solutions_path.glob('*/')]
+        changes.removed = snapshots.keys() - set(uuids)
+        for uuid in changes.removed:
+            del snapshots[uuid]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            signatures = dict(zip(uuids, executor.map(signature, uuids)))
+            outdated = [uuid for uuid, project_signature in signatures.items()
+                        if uuid not in snapshots or snapshots[uuid].signature != project_signature]
+            for uuid, properties in zip(outdated, executor.map(read_project, outdated)):
+                if uuid in snapshots:
+                    changes.modified.add(uuid)
+                else:
+                    changes.added.add(uuid)
+                snapshots[uuid] = ProjectSnapshot(signatures[uuid], properties)
+
+        check_cancelled()
+        with self._lock:
+            self.solutions_path = solutions_path
+            self.snapshots = snapshots
+        return changes
+
+    def projects(self) -> List[Tuple[str, ProjectProperties | None]]:
+        _, snapshots = self._published()
+        return [(uuid, snapshot.properties) for uuid, snapshot in snapshots.items()]
+
+    def summaries(self, solutions_path: str | bytes | PathLike = None) -> List[ProjectSummary]:
+        """
+        Projects of the index, most recently modified first.
+        With solutions_path, the list is empty unless the index is the one of that directory.
+        """
+        path, snapshots = self._published()
+        if solutions_path is not None and Path(solutions_path) != path:
+            return []
+        summaries = [ProjectSummary(uuid, s.properties.name, s.properties.author, s.properties.project_type,
+                                    s.properties.last_modified)
+                     for uuid, s in snapshots.items() if s.properties is not None]
+        return sorted(summaries, key=lambda x: x.last_modified, reverse=True)
+
+    def save(self, filename):
+        """ Save the index so that the projects list can be displayed at once on next start """
+        solutions_path, snapshots = self._published()
+        data = {
+            'version': PROJECT_INDEX_VERSION,
+            'solutions_path': str(solutions_path),
+            'projects': {
+                uuid: {
+                    'signature': snapshot.signature,
+                    'properties': None if snapshot.properties is None else {
+                        'name': snapshot.properties.name,
+                        'author': snapshot.properties.author,
+                        'project_type': snapshot.properties.project_type,
+                        'last_modified': snapshot.properties.last_modified.isoformat(),
+                    }
+                } for uuid, snapshot in snapshots.items()
+            }
+        }
+        filename = Path(filename)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file first so that a concurrent load never reads a partial file
+        fd, tmp_filename = tempfile.mkstemp(dir=filename.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_filename, filename)
+        except OSError as e:
+            logger.warning(f'Unable to save the project index to {filename}: {e}')
+            Path(tmp_filename).unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, filename) -> 'ProjectIndex':
+        """ Load an index saved by save(). An empty index is returned if it cannot be read. """
+        index = cls()
+        try:
+            with open(filename, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != PROJECT_INDEX_VERSION:
+                return index
+            snapshots = {}
+            for uuid, project in data['projects'].items():
+                properties = project['properties']
+                if properties is not None:
+                    properties = ProjectProperties(name=properties['name'], author=properties['author'],
+                                                   project_type=properties['project_type'],
+                                                   last_modified=datetime.fromisoformat(properties['last_modified']))
+                signature = tuple(None if s is None else tuple(s) for s in project['signature'])
+                snapshots[uuid] = ProjectSnapshot(signature, properties)
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f'Unable to load the project index from {filename}: {e}')
+            return index
+        index.solutions_path = Path(data['solutions_path'])
+        index.snapshots = snapshots
+        return index
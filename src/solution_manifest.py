@@ -0,0 +1,80 @@
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+@dataclass(slots=True, eq=False)
+class ManifestEntity:
+    id: str | None
+    type: str | None
+    subtype: str | None
+    name: str | None
+    namespace: str | None
+    parent: 'ManifestEntity | None' = None
+    children: List['ManifestEntity'] = field(default_factory=list)
+
+
+class SolutionManifest:
+    """
+    Entities declared in the project .oem file.
+
+    The file is parsed once and only the attributes of the Entity elements are kept.
+    They are indexed by id and by type/subtype so that they can be found without scanning the tree.
+    """
+    def __init__(self, oem_file):
+        self.oem_file = Path(oem_file)
+        self.root_entities: List[ManifestEntity] = []
+        self._by_id: Dict[str, ManifestEntity] = {}
+        self._by_type: Dict[str, List[ManifestEntity]] = defaultdict(list)
+        self._by_subtype: Dict[Tuple[str, str], List[ManifestEntity]] = defaultdict(list)
+        self._parse()
+
+    def _parse(self):
+        stack = []
+        with open(self.oem_file, 'rb') as f:
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                if elem.tag != 'Entity':
+                    continue
+                if event == 'start':
+                    parent = stack[-1] if stack else None
+                    entity = ManifestEntity(id=elem.get('id'), type=elem.get('type'), subtype=elem.get('subtype'),
+                                            name=elem.get('name'), namespace=elem.get('namespace'), parent=parent)
+                    if parent is not None:
+                        parent.children.append(entity)
+                    else:
+                        self.root_entities.append(entity)
+                    if entity.id is not None:
+                        self._by_id[entity.id] = entity
+                    self._by_type[entity.type].append(entity)
+                    self._by_subtype[(entity.type, entity.subtype)].append(entity)
+                    stack.append(entity)
+                else:
+                    stack.pop()
+                    elem.clear()
+
+    def find_by_id(self, entity_id: str) -> ManifestEntity | None:
+        return self._by_id.get(entity_id)
+
+    def find_by_type(self, entity_type: str, subtype: str = None) -> List[ManifestEntity]:
+        """ Entities of the given type, in declaration order. Any subtype matches if subtype is None. """
+        if subtype is None:
+            return self._by_type.get(entity_type, [])
+        return self._by_subtype.get((entity_type, subtype), [])
+
+    @property
+    def solution_name(self) -> str:
+        solutions = self.find_by_type('Solution')
+        return solutions[0].name or '' if solutions else ''
+
+    @property
+    def global_variables(self) -> ManifestEntity | None:
+        entities = self.find_by_type('Variables', 'Global')
+        return entities[0] if entities else None
+
+    @property
+    def data_types(self) -> List[ManifestEntity]:
+        """ DataType entities of the IecData groups. Each of them refers to the DataType file of a namespace """
+        return [child for group in self.find_by_type('Group', 'IecData')
+                for child in group.children if child.type == 'DataType']
@@ -0,0 +1,177 @@
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from instrumentation import get_profiler
+from sysmac_array import ArrayDimension, array_size, format_ranges, iter_index_suffixes, parse_array_type
+from sysmac_data_type import BASE_TYPES, INTERNAL_TYPES, SysmacDataType, get_internal_type
+from type_resolver import TypeResolver
+
+
+class TagLimitExceeded(Exception):
+    """ Raised before the expansion of global variables which would produce more symbols than allowed """
+    def __init__(self, count: int, limit: int):
+        super().__init__(f'The export would produce {count} tags, more than the limit of {limit} tags')
+        self.count = count
+        self.limit = limit
+
+
+class LeafSymbol(NamedTuple):
+    """ An exported symbol, ie: a global variable or a member of it whose type is a base type """
+    name: str
+    base_type: str
+    comment: str | None
+
+
+class ArrayRange(NamedTuple):
+    """
+    Elements of an array of user type within a template.
+    The index ranges are kept symbolic: element names are only generated when the template is instantiated.
+    """
+    suffix: str
+    dimensions: Tuple[ArrayDimension, ...]
+    members: 'Template'
+
+
+class UnresolvedMember(NamedTuple):
+    """ Member of a type which could not be resolved within a template. It is skipped when instantiated. """
+    suffix: str
+    reference: str
+
+
+# Flattened members of a type, relative to the symbol name.
+# Each entry is either a leaf member: (name suffix, base type, comment), eg: ('.Status.Active', 'BOOL', 'Axis active')
+# or an ArrayRange, eg: ArrayRange('.Axes', (ArrayDimension(0, 63),), <template of the element type>)
+# or an UnresolvedMember, eg: UnresolvedMember('.Motor', 'sUnknownType')
+Template = Tuple[Tuple[str, str, str | None] | ArrayRange | UnresolvedMember, ...]
+
+
+def _prefixed(template: Template, prefix: str) -> Iterator[Tuple[str, str, str | None] | ArrayRange | UnresolvedMember]:
+    for entry in template:
+        if type(entry) is tuple:
+            suffix, base_type, comment = entry
+            yield f'{prefix}{suffix}', base_type, comment
+        else:
+            yield entry._replace(suffix=f'{prefix}{entry.suffix}')
+
+
+def instantiate(template: Template, name: str,
+                skipped: Callable[[str, str], None] = None) -> Iterator[LeafSymbol]:
+    """
+    Yield the leaf symbols of a variable from the template of its type.
+    skipped(reference, symbol name) is called for each symbol skipped because its type could not be resolved.
+    """
+    for entry in template:
+        if type(entry) is tuple:
+            suffix, base_type, comment = entry
+            yield LeafSymbol(f'{name}{suffix}', base_type, comment)
+        elif type(entry) is ArrayRange:
+            get_profiler().count('array elements', array_size(entry.dimensions))
+            for index in iter_index_suffixes(entry.dimensions):
+                yield from instantiate(entry.members, f'{name}{entry.suffix}{index}', skipped)
+        elif skipped is not None:
+            skipped(entry.reference, f'{name}{entry.suffix}')
+
+
+def count_leaves(template: Template) -> int:
+    """ Number of leaf symbols of a template, computed without instantiating it """
+    count = 0
+    for entry in template:
+        if type(entry) is tuple:
+            count += 1
+        elif type(entry) is ArrayRange:
+            count += array_size(entry.dimensions) * count_leaves(entry.members)
+    return count
+
+
+class SymbolExpander:
+    """
+    Expand global variables into their leaf members.
+
+    The leaf members of each STRUCT type are computed once and kept as a template made of the name suffix,
+    the base type and the comment of each member. Every variable of that type is then expanded by prefixing
+    the template with its own name, so the expansion time is proportional to the number of exported symbols.
+    Arrays of user types are kept as ranges in the templates so that their size does not depend on the
+    number of elements.
+    The user types are found by the resolver, which collects the references that could not be resolved.
+    """
+    def __init__(self, data_types: Dict[str, SysmacDataType], resolver: TypeResolver = None):
+        self.data_types = data_types
+        self.resolver = resolver or TypeResolver(data_types)
+        self._struct_templates: Dict[str, Template] = {}
+        self._internal_templates: Dict[str, Template] = {}
+        # Number of leaf symbols of a global variable, by type
+        self._leaf_counts: Dict[str, int] = {}
+
+    def expand(self, symbol: SysmacDataType) -> Iterator[LeafSymbol]:
+        """ Yield the leaf symbols of a global variable """
+        return instantiate(self.template(symbol.base_type, symbol.comment), symbol.name, self.resolver.add_failure)
+
+    def leaf_count(self, base_type: str) -> int:
+        """ Number of leaf symbols of a global variable of that type, computed without instantiating its template """
+        count = self._leaf_counts.get(base_type)
+        if count is None:
+            count = self._leaf_counts[base_type] = count_leaves(self.template(base_type, None))
+        return count
+
+    def estimate(self, symbols: Iterable[SysmacDataType]) -> int:
+        """ Number of leaf symbols the global variables expand to """
+        return sum(self.leaf_count(s.base_type) for s in symbols)
+
+    def struct_template(self, type_name: str) -> Template:
+        """ Leaf members of a STRUCT type. type_name is its key in data_types. """
+        template = self._struct_templates.get(type_name)
+        if template is None:
+            data_type = self.data_types[type_name]
+            # The types of the members are referred to from the namespace of the STRUCT
+            template = tuple(self._members_template(data_type.children, data_type.namespace))
+            self._struct_templates[type_name] = template
+            get_profiler().count('templates built')
+        return template
+
+    def _members_template(self, members: Iterable[SysmacDataType], namespace: str | None) -> List:
+        template = []
+        for child in members:
+            if child.is_struct and child.children:
+                # STRUCT declared inline: its members are those of the definition nested in the parent one
+                child_template = self._members_template(child.children, namespace)
+            else:
+                child_template = self.template(child.base_type, child.comment, namespace)
+            template.extend(_prefixed(child_template, f'.{child.name}'))
+        return template
+
+    def internal_template(self, type_name: str) -> Template:
+        template = self._internal_templates.get(type_name)
+        if template is None:
+            template = []
+            for member in get_internal_type(type_name):
+                template.extend(_prefixed(self.template(member.base_type, member.comment), f'.{member.name}'))
+            template = self._internal_templates[type_name] = tuple(template)
+        return template
+
+    def template(self, base_type: str, comment: str | None, namespace: str = None) -> Template:
+        """
+        Leaf members of a symbol, relative to the symbol name.
+        namespace is the one from which base_type is referred to, None for the global variables.
+        """
+        if base_type in BASE_TYPES:
+            return ('', base_type, comment),
+        elif base_type in INTERNAL_TYPES:
+            return self.internal_template(base_type)
+        elif base_type.startswith('ARRAY'):
+            dimensions, element_type = parse_array_type(base_type)
+            # Array of base type -> Do not expand more
+            #  eg: "aCptNDef" of type "USINT[0..19,1..2]" instead of "aCptNDef[0,1]", "aCptNDef[0,2]", ...
+            if element_type in BASE_TYPES:
+                return ('', f'{element_type}[{format_ranges(dimensions)}]', comment),
+            return ArrayRange('', tuple(dimensions), self.template(element_type, comment, namespace)),
+
+        type_name = self.resolver.resolve(base_type, namespace)
+        if type_name is not None:
+            data_type = self.data_types[type_name]
+            if data_type.is_enum:
+                return ('', 'DINT', comment),
+            elif data_type.is_struct:
+                return self.struct_template(type_name)
+            return ()
+
+        # Reported with the name of each symbol skipped when the template is instantiated
+        return UnresolvedMember('', base_type),
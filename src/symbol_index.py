@@ -0,0 +1,152 @@
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+# Number of candidate rows examined per call to SymbolSelection.fetch()
+FETCH_STEP = 2000
+
+
+class SymbolSelection:
+    """
+    Read-only sequence of the symbols matching a query, in name order.
+
+    The matches are searched lazily: fetch() examines the next candidate rows and adds the matching ones,
+    so that the first matches can be displayed without searching all the symbols. len() is the number
+    of matches found so far, which is the final count once complete is True.
+    Indexing beyond the matches found so far fetches the next ones.
+    """
+    def __init__(self, symbols: Sequence, order: List[int], candidates: Iterable[int],
+                 predicates: List[Callable[[int], bool]] = ()):
+        self._symbols = symbols
+        self._order = order
+        if predicates or not isinstance(candidates, range):
+            self._positions: List[int] | range = []
+            self._candidates = iter(candidates)
+            self._predicates = predicates
+            self.complete = False
+        else:
+            # Positions of a prefix query: nothing to search
+            self._positions = candidates
+            self.complete = True
+
+    def fetch(self, count: int = FETCH_STEP) -> bool:
+        """ Examine the next count candidate rows. Returns True once all of them have been examined. """
+        if self.complete:
+            return True
+        positions, predicates = self._positions, self._predicates
+        examined = 0
+        for position in self._candidates:
+            if all(predicate(position) for predicate in predicates):
+                positions.append(position)
+            examined += 1
+            if examined == count:
+                return False
+        self.complete = True
+        return True
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, index: int):
+        while index >= len(self._positions) and not self.complete:
+            self.fetch()
+        return self._symbols[self._order[self._positions[index]]]
+
+
+class _TextColumn:
+    """
+    Values of a column joined in a single lowercase text, one value per line.
+    A substring is searched with str.find over the whole text, then each match is mapped to its row.
+    """
+    def __init__(self, values: List[str]):
+        self.values = values
+        self.text = '\n'.join(values)
+        self.starts = []
+        position = 0
+        for value in values:
+            self.starts.append(position)
+            position += len(value) + 1
+
+    def count(self, substring: str) -> int:
+        """ Number of occurrences of the substring: an upper bound of the number of rows containing it """
+        return self.text.count(substring)
+
+    def iter_rows(self, substring: str) -> Iterator[int]:
+        """ Rows whose value contains the substring. The text is searched as the rows are consumed. """
+        text, starts = self.text, self.starts
+        position = text.find(substring)
+        while position != -1:
+            row = bisect_right(starts, position) - 1
+            yield row
+            if row + 1 == len(starts):
+                break
+            # Skip the other matches of that row
+            position = text.find(substring, starts[row + 1])
+
+    def contains(self, substring: str) -> Callable[[int], bool]:
+        values = self.values
+        return lambda row: substring in values[row]
+
+
+class SymbolIndex:
+    """
+    Index of a set of symbols to filter them as the user types.
+
+    Rows are sorted by lowercase name once, so that prefix queries are two binary searches.
+    Substring queries are run on the names joined in a single text, which is searched by str.find rather than
+    by testing each name in Python. Types and comments are joined the same way when the index is built.
+
+    Queries are made of space separated terms, all of which must match (case insensitive):
+    - 'name*': names starting with 'name', eg: 'gAxis[3].Status.*'
+    - 'name': names containing 'name'
+    - 'type:BOOL', 'comment:speed': types or comments containing the given text
+    The most selective term gives the candidate rows, each of which is then tested against the other terms.
+    """
+    def __init__(self, symbols: Sequence):
+        self.symbols = symbols
+        if hasattr(symbols, 'names'):
+            names = [name.lower() for name in symbols.names]
+        else:
+            names = [s.name.lower() for s in symbols]
+        self._order = sorted(range(len(names)), key=names.__getitem__)
+        self._names = [names[i] for i in self._order]
+        self._columns: Dict[str, _TextColumn] = {
+            'name': _TextColumn(self._names),
+            'base_type': self._build_column('base_type'),
+            'comment': self._build_column('comment'),
+        }
+
+    def __len__(self):
+        return len(self._order)
+
+    def _build_column(self, field: str) -> _TextColumn:
+        get_value: Callable[[int], str | None] = (
+            getattr(self.symbols, field) if hasattr(self.symbols, field) and callable(getattr(self.symbols, field))
+            else lambda i: getattr(self.symbols[i], field)
+        )
+        return _TextColumn([(get_value(i) or '').lower().replace('\n', ' ') for i in self._order])
+
+    def _term(self, term: str) -> Tuple[Callable[[], int], Iterable[int], Callable[[int], bool]]:
+        """ (Function giving an upper bound of the number of matches, positions of the matches, predicate) of a term """
+        field, _, value = term.partition(':')
+        if value and field in ('type', 'comment'):
+            column = self._columns['base_type' if field == 'type' else 'comment']
+            return lambda: column.count(value), column.iter_rows(value), column.contains(value)
+        if term.endswith('*'):
+            prefix = term.rstrip('*')
+            start = bisect_left(self._names, prefix)
+            positions = range(start, bisect_left(self._names, prefix + '\uffff', start))
+            names = self._names
+            return positions.__len__, positions, lambda position: names[position].startswith(prefix)
+        column = self._columns['name']
+        return lambda: column.count(term), column.iter_rows(term), column.contains(term)
+
+    def search(self, query: str) -> SymbolSelection:
+        terms = [self._term(term) for term in query.lower().split()]
+        # Counting the occurrences of a term is only needed to choose the most selective one
+        if len(terms) > 1:
+            terms.sort(key=lambda t: t[0]())
+        if not terms:
+            return SymbolSelection(self.symbols, self._order, range(len(self._order)))
+        _, candidates, _ = terms[0]
+        return SymbolSelection(self.symbols, self._order, candidates, [predicate for _, _, predicate in terms[1:]])
@@ -0,0 +1,108 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class SymbolRow:
+    """ Lightweight view on a row of a SymbolTable. It exposes the same attributes as LeafSymbol. """
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'SymbolTable', index: int):
+        self._table = table
+        self._index = index
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name}, {self.base_type})'
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._index]
+
+    @property
+    def base_type(self) -> str:
+        return self._table.base_type(self._index)
+
+    @property
+    def comment(self) -> str | None:
+        return self._table.comment(self._index)
+
+
+class _StringPool:
+    """ Interned strings, referred to by their index """
+    __slots__ = ('values', '_ids')
+
+    def __init__(self):
+        self.values: List[str | None] = []
+        self._ids: Dict[str | None, int] = {}
+
+    def add(self, value: str | None) -> int:
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+
+class SymbolTable:
+    """
+    Compact container of expanded symbols, stored column by column.
+
+    Names are kept in a list while types and comments are interned: each row only stores their index
+    in an array of integers. Thousands of array elements sharing the same type and comment thus only cost
+    a few bytes each. Rows are accessed through SymbolRow views, created on demand.
+    """
+    def __init__(self):
+        self.names: List[str] = []
+        self._type_ids = array('I')
+        self._comment_ids = array('I')
+        self._types = _StringPool()
+        self._comments = _StringPool()
+
+    @classmethod
+    def from_symbols(cls, symbols: Iterable) -> 'SymbolTable':
+        """ Build a table from objects having name, base_type and comment attributes (eg: LeafSymbol) """
+        table = cls()
+        table.extend(symbols)
+        return table
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> SymbolRow:
+        if index < 0:
+            index += len(self.names)
+        if not 0 <= index < len(self.names):
+            raise IndexError('SymbolTable index out of range')
+        return SymbolRow(self, index)
+
+    def __iter__(self) -> Iterator[SymbolRow]:
+        for i in range(len(self.names)):
+            yield SymbolRow(self, i)
+
+    def append(self, name: str, base_type: str, comment: str | None):
+        self.names.append(name)
+        self._type_ids.append(self._types.add(base_type))
+        self._comment_ids.append(self._comments.add(comment))
+
+    def extend(self, symbols: Iterable):
+        for s in symbols:
+            self.append(s.name, s.base_type, s.comment)
+
+    def base_type(self, index: int) -> str:
+        return self._types.values[self._type_ids[index]]
+
+    def comment(self, index: int) -> str | None:
+        return self._comments.values[self._comment_ids[index]]
+
+    def rows(self) -> Iterator[Tuple[str, str, str | None]]:
+        """ Iterate over the (name, base type, comment) tuples without creating row views """
+        types = self._types.values
+        comments = self._comments.values
+        for name, type_id, comment_id in zip(self.names, self._type_ids, self._comment_ids):
+            yield name, types[type_id], comments[comment_id]
+
+    def sort(self):
+        """ Sort the rows by name """
+        order = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self.names = [self.names[i] for i in order]
+        self._type_ids = array('I', (self._type_ids[i] for i in order))
+        self._comment_ids = array('I', (self._comment_ids[i] for i in order))
@@ -1,5 +1,5 @@
 
-from internal_types import *
+from internal_types import INTERNAL_TYPES
 
 BASE_TYPES = [
     'BOOL',
@@ -24,15 +24,9 @@ BASE_TYPES = [
     'WORD'
 ]
 
-INTERNAL_TYPES = {
-    '_sAXIS_REF_STA'        : sAXIS_REF_STA,
-    '_sAXIS_REF_DET'        : sAXIS_REF_DET,
-    '_sAXIS_REF_STA_DRV'    : sAXIS_REF_STA_DRV,
-    '_sMC_REF_EVENT'        : sMC_REF_EVENT
-}
-
 
 def get_internal_type(key):
+    """ Members of a controller-defined type """
     return INTERNAL_TYPES[key]
 
 
@@ -76,7 +70,7 @@ class SysmacDataType:
             else:
                 return f'{self.__class__.__name__}({self.name})'
 
-    def _parse_xml(self, xml_element, namespace=None, parent=None, prefix=None):
+    def _parse_xml(self, xml_element, namespace=None, parent=None, prefix=None, with_children=True):
         self.namespace = namespace
         self.parent = parent
         self.name = xml_element.get('Name') if prefix is None else f'{prefix}.{xml_element.get('Name')}'
@@ -92,8 +86,11 @@ class SysmacDataType:
         self.order = xml_element.get('Order')
         self.offset_type = xml_element.get('OffsetType')
 
-        self.children = [SysmacDataType.import_from_xml(child_datatype_elmt, namespace=namespace, parent=self)
-                         for child_datatype_elmt in xml_element.findall(".//DataType")]
+        # Only the direct children are members of this type: nested definitions are built by their own parent.
+        # That way, each element is visited once whatever the nesting depth.
+        if with_children:
+            self.children = [SysmacDataType.import_from_xml(child_datatype_elmt, namespace=namespace, parent=self)
+                             for child_datatype_elmt in xml_element.iterfind("DataType")]
         return self
 
     def _parse_slwd(self, slwd_dict, namespace=None, parent=None):
@@ -115,8 +112,9 @@ class SysmacDataType:
         return self
 
     @classmethod
-    def import_from_xml(cls, xml_element, namespace=None, parent=None, prefix=None):
-        return cls()._parse_xml(xml_element, namespace=namespace, parent=parent, prefix=prefix)
+    def import_from_xml(cls, xml_element, namespace=None, parent=None, prefix=None, with_children=True):
+        return cls()._parse_xml(xml_element, namespace=namespace, parent=parent, prefix=prefix,
+                                with_children=with_children)
 
     @classmethod
     def import_from_slwd(cls, slwd_dict, namespace=None, parent=None):
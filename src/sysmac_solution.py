@@ -1,30 +1,41 @@
-import copy
 import logging
-import xml.etree.ElementTree as ET
 from datetime import datetime
 from os import PathLike
 from pathlib import Path
-from typing import Dict, List
+from typing import Collection, Dict, Iterator, List, Tuple
 
-from sysmac_array import SysmacArray
-from sysmac_data_type import SysmacDataType, get_internal_type
-from utils import parse_slwd, get_enum_from_namespace, get_struct_from_namespace
+from instrumentation import get_profiler
+from progress import CancellationToken, ProgressReporter
+from solution_cache import SolutionCache
+from solution_discovery import ProjectIndex, ProjectProperties, discover_projects, read_project_properties
+from solution_manifest import SolutionManifest
+from symbol_expansion import LeafSymbol, SymbolExpander, TagLimitExceeded
+from symbol_table import SymbolRow, SymbolTable
+from sysmac_data_type import SysmacDataType
+from utils import load_data_types, read_slwd
 
 
 logger = logging.getLogger(__name__)
 
+PUBLICATION_VALUES = ('PublicationOnly', 'PublicationInput', 'PublicationOutput')
+
+# Number of symbols produced between two checks of the cancellation token
+PROGRESS_STEP = 4096
+
 
 class SysmacSolution:
-    def __init__(self, solutions_path, uuid):
+    def __init__(self, solutions_path, uuid, cache: SolutionCache = None, properties: ProjectProperties = None):
         self.solutions_path = Path(solutions_path)
         self._uuid = uuid
+        self.cache = cache
         self._name = ''
         self._author = ''
         self._project_type = ''
         self._last_modified = datetime.fromtimestamp(0)
         self.global_vars = []
+        self._manifest = None
 
-        self._get_properties()
+        self._get_properties(properties)
 
     @property
     def author(self):
@@ -34,6 +45,16 @@ class SysmacSolution:
     def last_modified(self):
         return self._last_modified
 
+    @property
+    def manifest(self) -> SolutionManifest:
+        """ Entities of the project .oem file, parsed on first access """
+        if self._manifest is None:
+            profiler = get_profiler()
+            with profiler.stage('manifest'):
+                self._manifest = SolutionManifest(self.solutions_path / self._uuid / f'{self._uuid}.oem')
+            profiler.count('files parsed')
+        return self._manifest
+
     @property
     def name(self):
         return self._name
@@ -46,148 +67,186 @@ class SysmacSolution:
     def uuid(self):
         return self._uuid
 
-    def get_global_vars(self) -> List[SysmacDataType]:
-        project_oem_file = f'{self._uuid}.oem'
-        tree = ET.parse(self.solutions_path / self._uuid / project_oem_file)
-        root = tree.getroot()
-        global_vars_filename = root.find(".//Entity[@type='Variables'][@subtype='Global']").attrib.get('id')
-        self.global_vars = [SysmacDataType.import_from_slwd(symbol)
-                            for symbol in parse_slwd(self.solutions_path / self._uuid / f"{global_vars_filename}.xml")]
+    def get_global_vars(self, progress: ProgressReporter = None) -> List[SysmacDataType]:
+        self.global_vars = self._read_global_vars('global_vars', progress=progress)
         return self.global_vars
 
-    def get_published_symbols(self) -> List[SysmacDataType]:
-        base_type_symbols = []
-        user_type_symbols = []
-
-        dt = self._get_data_types()
-        self.get_global_vars()
-
-        # Go through the global variables and expand STRUCT type symbols
-        # When the symbols are from base type, they are added to base_type_symbols list
-        # Custom type symbols are added to user_type_symbols list to be expanded later on.
-        for s in self.global_vars:
-            if not s.network_publish:
-                continue
-            if s.network_publish not in ['PublicationOnly', 'PublicationInput', 'PublicationOutput']:
-                continue
-
-            if s.is_base_type:
-                base_type_symbols.append(s)
-            elif s.is_internal_type:
-                # TODO
-                raise NotImplementedError()
-            elif s.is_array:
-                array_symbol = SysmacArray(s)
-                array_vars = array_symbol.expand()
-                if array_symbol.is_base_type:
-                    base_type_symbols.extend(array_vars)
-                elif array_symbol.is_internal_type:
-                    # TODO
-                    raise NotImplementedError()
-                else:
-                    user_type_symbols.extend(array_vars)
-            # TODO: Check what happens for a global variable derived from type ENUM
-            # elif dt[s.base_type].is_enum:
-            #     s.base_type = 'DINT'
-            #     base_type_symbols.append(s)
-            elif s.base_type in dt.keys():
-                user_type_symbols.append(s)
-            else:
-                logger.info(f'"{s.name}" symbol of type <{s.base_type}> has been skipped !!)')
-
-        # Custom type symbols are added to user_type_symbols list
-        # Go through that list to expand the variables till getting the members from base type.
-        while len(user_type_symbols) > 0:
-            s = user_type_symbols.pop()
-            if s.is_base_type:
-                base_type_symbols.append(s)
-                continue
-            elif s.is_internal_type:
-                # TODO
-                raise NotImplementedError()
-            elif s.is_array:
-                array_symbol = SysmacArray(s)
-                array_vars = array_symbol.expand()
-                if array_symbol.is_base_type:
-                    base_type_symbols.extend(array_vars)
-                elif array_symbol.is_internal_type:
-                    # TODO
-                    raise NotImplementedError()
-                else:
-                    user_type_symbols.extend(array_vars)
-                continue
-            elif s.base_type in dt.keys():
-                if dt[s.base_type].is_enum:
-                    s.base_type = 'DINT'
-                    base_type_symbols.append(s)
-                    continue
-                elif dt[s.base_type].is_struct:
-                    for child in dt[s.base_type].children:
-                        new_symbol = copy.deepcopy(child)
-                        new_symbol.parent = None
-                        new_symbol.namespace = None
-                        new_symbol.name = f'{s.name}.{child.name}'
-                        if child.is_base_type:
-                            base_type_symbols.append(new_symbol)
-                        elif child.is_internal_type:
-                            root = ET.fromstring(get_internal_type(child.base_type))
-                            new_symbols = [SysmacDataType.import_from_xml(elmt,
-                                                                          namespace=child.namespace,
-                                                                          parent=new_symbol,
-                                                                          prefix=f'{s.name}.{child.name}')
-                                           for elmt in root.findall(".//DataType")]
-                            user_type_symbols.extend(new_symbols)
-                        else:
-                            user_type_symbols.append(new_symbol)
-            else:
-                logger.info(f'"{s.name}" symbol of type <{s.base_type}> has been skipped !!)')
-
-        base_type_symbols.sort(key=lambda x: x.name)
-        return base_type_symbols
-
-    def _get_data_types(self) -> Dict[str, SysmacDataType]:
-        project_oem_file = f'{self._uuid}.oem'
-        tree = ET.parse(self.solutions_path / self._uuid / project_oem_file)
-        root = tree.getroot()
-
-        dt = {}
-        for entity in root.iter('Entity'):
-            if entity.get('type') == 'Group' and entity.get('subtype') == 'IecData':
-                for child in entity.find('ChildEntities'):
-                    if child.tag == 'Entity' and child.get('type') == 'DataType':
-                        # Extend the dictionary with new values
-                        dt |= self._get_data_from_namespace(child.get('id'), child.get('namespace'))
-
-        return dt
-
-    def _get_data_from_namespace(self, datatype_id, namespace=None) -> Dict[str, SysmacDataType]:
-        datatype_file = f"{datatype_id}.xml"
-        tree = ET.parse(self.solutions_path / self._uuid / datatype_file)
-        root = tree.getroot()
-
-        data = get_struct_from_namespace(root, namespace)
-        data |= get_enum_from_namespace(root, namespace)
-        return data
-
-    def _get_properties(self):
-        try:
-            tree = ET.parse(self.solutions_path / self._uuid / f'{self._uuid}.xml')
-        except FileNotFoundError as e:
+    def get_published_vars(self, progress: ProgressReporter = None) -> List[SysmacDataType]:
+        """ Get the global variables published on the network. The other ones are skipped while parsing. """
+        return self._read_global_vars('published_vars', {'NTP': PUBLICATION_VALUES}, progress)
+
+    def _read_global_vars(self, cache_key: str, where: Dict[str, Collection[str]] = None,
+                          progress: ProgressReporter = None) -> List[SysmacDataType]:
+        profiler = get_profiler()
+        with profiler.stage('global variables'):
+            project_oem_file = self.solutions_path / self._uuid / f'{self._uuid}.oem'
+            if self.cache is not None:
+                global_vars = self.cache.get(self.solutions_path / self._uuid, cache_key)
+                if global_vars is not None:
+                    profiler.count('cache hits')
+                    return global_vars
+
+            global_vars_file = self.solutions_path / self._uuid / f"{self.manifest.global_variables.id}.xml"
+            global_vars = [SysmacDataType.import_from_slwd(symbol) for symbol in read_slwd(global_vars_file, where)]
+            profiler.count('files parsed')
+            if progress is not None:
+                progress.file_parsed()
+
+            if self.cache is not None:
+                self.cache.set(self.solutions_path / self._uuid, cache_key, global_vars,
+                               [project_oem_file, global_vars_file])
+            return global_vars
+
+    def iter_published_symbols(self, sort: bool = False, progress: ProgressReporter = None,
+                               cancel: CancellationToken = None,
+                               max_tags: int = None) -> Iterator[LeafSymbol | SymbolRow]:
+        """
+        Iterate over the leaf symbols of the published global variables.
+
+        By default, the symbols are produced lazily in the declaration order of the global variables so that
+        they can be exported without holding them all in memory. With sort=True, they are sorted by name,
+        which requires to expand all of them first.
+        The progress reporter is given the number of files parsed, of global variables expanded and of symbols
+        produced. The cancellation token is checked between global variables and every PROGRESS_STEP symbols:
+        ExportCancelled is raised once it has been cancelled.
+        The project files are read by this call. With max_tags, it raises TagLimitExceeded if there would be
+        more symbols, before any of them is expanded.
+        """
+        if sort:
+            return iter(self.get_published_symbols(progress, cancel, max_tags))
+        expander, published = self._prepare_expansion(progress, max_tags)
+        return self._expand(expander, published, progress, cancel)
+
+    def _prepare_expansion(self, progress: ProgressReporter = None,
+                           max_tags: int = None) -> Tuple[SymbolExpander, List[SysmacDataType]]:
+        expander = SymbolExpander(self.get_data_types(progress))
+        published = self.get_published_vars(progress)
+        if max_tags:
+            # The templates built to count the symbols are then used to expand them
+            with get_profiler().stage('estimation'):
+                count = expander.estimate(published)
+            if count > max_tags:
+                raise TagLimitExceeded(count, max_tags)
+        return expander, published
+
+    def _expand(self, expander: SymbolExpander, published: List[SysmacDataType], progress: ProgressReporter = None,
+                cancel: CancellationToken = None) -> Iterator[LeafSymbol]:
+        # Go through the published global variables and expand them till getting the members from base type.
+        # STRUCT types are flattened once by the expander then reused for every variable of that type.
+        profiler = get_profiler()
+        if progress is None and cancel is None:
+            for s in published:
+                profiler.count('globals expanded')
+                yield from expander.expand(s)
+            self._report_unresolved_types(expander)
             return
-        root = tree.getroot()
-
-        self._project_type = root.find('.//ProjectType').text
-        self._author = root.find('.//Author').text
-        self._last_modified = datetime.fromisoformat(root.find('.//DateModified').text)
 
-        tree = ET.parse(self.solutions_path / self._uuid / f'{self._uuid}.oem')
-        root = tree.getroot()
-        solution_element = root.find(".//Entity[@type='Solution']")
-        self._name = solution_element.attrib.get('name') if solution_element is not None else ''
+        state = progress.progress if progress is not None else None
+        if state is not None:
+            state.globals_total = len(published)
+        symbol_count = 0
+        for s in published:
+            if cancel is not None:
+                cancel.check()
+            profiler.count('globals expanded')
+            for symbol in expander.expand(s):
+                yield symbol
+                symbol_count += 1
+                # A single global variable may be a huge array of nested STRUCTs
+                if not symbol_count % PROGRESS_STEP:
+                    if cancel is not None:
+                        cancel.check()
+                    if state is not None:
+                        state.symbols = symbol_count
+                        progress.report()
+            if state is not None:
+                state.globals_done += 1
+                state.symbols = symbol_count
+                progress.report()
+        self._report_unresolved_types(expander)
+        if progress is not None:
+            progress.report(force=True)
+
+    @staticmethod
+    def _report_unresolved_types(expander: SymbolExpander):
+        # Once for the whole expansion rather than for each symbol skipped
+        if expander.resolver.failures:
+            get_profiler().count('unresolved types', len(expander.resolver.failures))
+            expander.resolver.log_failures()
+
+    def estimate_published_symbols(self) -> int:
+        """ Number of symbols of the published global variables, computed without expanding them """
+        expander = SymbolExpander(self.get_data_types())
+        published = self.get_published_vars()
+        with get_profiler().stage('estimation'):
+            return expander.estimate(published)
+
+    def get_published_symbols(self, progress: ProgressReporter = None, cancel: CancellationToken = None,
+                              max_tags: int = None) -> SymbolTable:
+        """ Get the leaf symbols of the published global variables, sorted by name """
+        profiler = get_profiler()
+        with profiler.stage('expansion'):
+            symbols = SymbolTable.from_symbols(self.iter_published_symbols(progress=progress, cancel=cancel,
+                                                                           max_tags=max_tags))
+        profiler.count('symbols expanded', len(symbols))
+        with profiler.stage('sort'):
+            symbols.sort()
+        return symbols
+
+    def get_data_types(self, progress: ProgressReporter = None) -> Dict[str, SysmacDataType]:
+        """ User data types of the project, by qualified name (eg: 'Ns1\\sMotor') """
+        profiler = get_profiler()
+        with profiler.stage('data types'):
+            project_oem_file = self.solutions_path / self._uuid / f'{self._uuid}.oem'
+            if self.cache is not None:
+                dt = self.cache.get(self.solutions_path / self._uuid, 'data_types')
+                if dt is not None:
+                    profiler.count('cache hits')
+                    return dt
+
+            dt = {}
+            dependencies = [project_oem_file]
+            for entity in self.manifest.data_types:
+                # Extend the dictionary with new values
+                dt |= self._get_data_from_namespace(entity.id, entity.namespace)
+                if progress is not None:
+                    progress.file_parsed()
+                dependencies.append(self.solutions_path / self._uuid / f"{entity.id}.xml")
+
+            if self.cache is not None:
+                self.cache.set(self.solutions_path / self._uuid, 'data_types', dt, dependencies)
+            return dt
 
-
-def get_solutions(solutions_path: str | bytes | PathLike) -> List[SysmacSolution]:
-    solutions = [SysmacSolution(solutions_path, s.stem) for s in Path(solutions_path).glob('*/')]
+    def _get_data_from_namespace(self, datatype_id, namespace=None) -> Dict[str, SysmacDataType]:
+        datatype_file = f"{datatype_id}.xml"
+        get_profiler().count('files parsed')
+        return load_data_types(self.solutions_path / self._uuid / datatype_file, namespace)
+
+    def _get_properties(self, properties: ProjectProperties = None):
+        if properties is None:
+            properties = read_project_properties(self.solutions_path / self._uuid, self._uuid)
+            if properties is None:
+                return
+
+        self._project_type = properties.project_type
+        self._author = properties.author
+        self._last_modified = properties.last_modified
+        self._name = properties.name
+
+
+def get_solutions(solutions_path: str | bytes | PathLike, max_workers: int = None,
+                  index: ProjectIndex = None, cancel: CancellationToken = None) -> List[SysmacSolution]:
+    """
+    When an index is given, only the project directories modified since its last refresh are read.
+    Its refresh can then be cancelled: ExportCancelled is raised.
+    """
+    if index is None:
+        projects = discover_projects(solutions_path, max_workers=max_workers)
+    else:
+        index.refresh(solutions_path, max_workers=max_workers, cancel=cancel)
+        projects = index.projects()
+    solutions = [SysmacSolution(solutions_path, uuid, properties=properties or ProjectProperties())
+                 for uuid, properties in projects]
     # Sort the project by last modification date by descending (most recently modified first)
     return sorted(solutions, key=lambda x: x.last_modified, reverse=True)
 
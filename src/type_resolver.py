@@ -0,0 +1,104 @@
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from sysmac_data_type import SysmacDataType
+
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_SEPARATOR = '\\'
+
+# Number of symbols given as example of each resolution failure
+FAILURE_EXAMPLES = 3
+
+
+@dataclass
+class ResolutionFailure:
+    """ A type reference which could not be resolved, with the symbols referring to it """
+    reference: str
+    # Types of that short name when the reference is ambiguous
+    candidates: Tuple[str, ...] = ()
+    count: int = 0
+    examples: List[str] = field(default_factory=list)
+
+    def __str__(self):
+        reason = f'ambiguous between {", ".join(self.candidates)}' if self.candidates else 'unknown type'
+        examples = ', '.join(f'"{name}"' for name in self.examples)
+        if self.count > len(self.examples):
+            examples += ', ...'
+        return f'<{self.reference}> ({reason}): {self.count} symbol(s) skipped, eg: {examples}'
+
+
+class TypeResolver:
+    """
+    Find the definition of the data types referred to by the global variables and the STRUCT members.
+
+    Types are indexed by their fully qualified name (eg: 'Ns1\\sMotor') and by their short name ('sMotor').
+    A reference is resolved as follows:
+    - a name starting with the separator (eg: '\\Ns1\\sMotor') is an absolute name, only looked up as is
+    - otherwise, the name is looked up relatively to the namespace of the referring type, then to each of
+      its parent namespaces up to the root namespace
+    - at last, a short name refers to the only type of that name whatever its namespace, such as a library type.
+      A short name defined in several namespaces is ambiguous and is not resolved.
+    Lookups are memoized, the failed ones as well, so that each distinct reference is only looked up once.
+    Failures are collected with the symbols referring to them to be reported at once (see log_failures).
+    """
+    def __init__(self, data_types: Dict[str, SysmacDataType]):
+        self.data_types = data_types
+        self._by_short_name: Dict[str, List[str]] = defaultdict(list)
+        for key in data_types:
+            self._by_short_name[key.rpartition(NAMESPACE_SEPARATOR)[2]].append(key)
+        self._lookups: Dict[Tuple[str | None, str], str | None] = {}
+        self.failures: Dict[str, ResolutionFailure] = {}
+
+    def resolve(self, reference: str, namespace: str = None) -> str | None:
+        """ Key in data_types of the type referred to from the namespace, None if it cannot be resolved """
+        key = (namespace, reference)
+        try:
+            return self._lookups[key]
+        except KeyError:
+            type_key = self._lookups[key] = self._lookup(reference, namespace)
+            return type_key
+
+    def get(self, reference: str, namespace: str = None) -> SysmacDataType | None:
+        type_key = self.resolve(reference, namespace)
+        return None if type_key is None else self.data_types[type_key]
+
+    def _lookup(self, reference: str, namespace: str | None) -> str | None:
+        if reference.startswith(NAMESPACE_SEPARATOR):
+            reference = reference[len(NAMESPACE_SEPARATOR):]
+            return reference if reference in self.data_types else None
+
+        scope = namespace
+        while scope:
+            candidate = f'{scope}{NAMESPACE_SEPARATOR}{reference}'
+            if candidate in self.data_types:
+                return candidate
+            scope = scope.rpartition(NAMESPACE_SEPARATOR)[0]
+        if reference in self.data_types:
+            return reference
+        if NAMESPACE_SEPARATOR not in reference:
+            candidates = self._by_short_name.get(reference, ())
+            if len(candidates) == 1:
+                return candidates[0]
+        return None
+
+    def add_failure(self, reference: str, symbol_name: str):
+        """ Record that a symbol has been skipped because its type could not be resolved """
+        failure = self.failures.get(reference)
+        if failure is None:
+            candidates = () if NAMESPACE_SEPARATOR in reference else tuple(self._by_short_name.get(reference, ()))
+            failure = self.failures[reference] = ResolutionFailure(reference, candidates)
+        failure.count += 1
+        if len(failure.examples) < FAILURE_EXAMPLES:
+            failure.examples.append(symbol_name)
+
+    def failure_report(self) -> str:
+        return '\n'.join(str(failure) for failure in self.failures.values())
+
+    def log_failures(self):
+        if self.failures:
+            logger.warning(f'{len(self.failures)} type(s) could not be resolved, the symbols of these types '
+                           f'have been skipped:\n{self.failure_report()}')
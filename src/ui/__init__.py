@@ -3,4 +3,11 @@ from .status_bar import StatusBar
 from .symbols_dialog import SymbolsDialog
 from .symbols_treeview import SymbolsTreeview
 from .truncated_label import TruncatedLabel
-from .worker_thread import WorkerThread
+
+
+def __getattr__(name):
+    # The executor imports the whole export pipeline: it is only loaded once the main window is displayed
+    if name == 'TaskExecutor':
+        from .task_executor import TaskExecutor
+        return TaskExecutor
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -9,8 +9,8 @@ class ProjectsTreeview(ttk.Treeview):
         frame = ttk.Frame(master, **kwargs)
         super().__init__(
             frame,
-            columns = ('Name', 'Author', 'DateModified', 'ProjectType'),
-            selectmode = 'browse',
+            columns = ('Name', 'Author', 'DateModified', 'ProjectType', 'Tags'),
+            selectmode = 'extended',
             show = 'headings'
         )
 
@@ -19,6 +19,7 @@ class ProjectsTreeview(ttk.Treeview):
         self.heading("Author", text="Author", sort_by='name')
         self.heading("DateModified", text="Last modification", sort_by='date')
         self.heading("ProjectType", text="Type", sort_by='name')
+        self.heading("Tags", text="Tags", sort_by='num')
 
         # Define column widths
         self.column("#0", width=10, stretch=False)
@@ -26,6 +27,7 @@ class ProjectsTreeview(ttk.Treeview):
         self.column("Author", width=100, anchor='center', stretch=False)
         self.column("DateModified", width=140, stretch=False)
         self.column("ProjectType", width=100, stretch=False)
+        self.column("Tags", width=80, anchor='e', stretch=False)
 
         # Create scrollbars
         v_scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.yview)
@@ -38,6 +40,11 @@ class ProjectsTreeview(ttk.Treeview):
         self.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         frame.pack(fill=tk.BOTH, expand=True)
 
+        # Column sort applied by the user, re-applied when the projects are updated
+        self._sort = None
+        # Estimated number of tags of the projects, by UUID. Only known for the projects selected so far.
+        self._tag_counts = {}
+
         self.enable_selection()
 
     def heading(self, column, sort_by=None, **kwargs):
@@ -53,9 +60,14 @@ class ProjectsTreeview(ttk.Treeview):
         for index, (_, k) in enumerate(l):
             self.move(k, '', index)
         self.heading(column, command=partial(callback, column, not reverse))
+        self._sort = (callback, column, reverse)
 
     def _sort_column_by_num(self, column, reverse):
-        self._sort_column(column, reverse, int, self._sort_column_by_num)
+        def _str_to_int(string):
+            # Empty cells first
+            return int(string) if string != '' else -1
+
+        self._sort_column(column, reverse, _str_to_int, self._sort_column_by_num)
 
     def _sort_column_by_name(self, column, reverse):
         self._sort_column(column, reverse, str, self._sort_column_by_name)
@@ -67,25 +79,63 @@ class ProjectsTreeview(ttk.Treeview):
         self._sort_column(column, reverse, _str_to_datetime, self._sort_column_by_date)
 
     def update_projects(self, data):
-        self.delete(*self.get_children())
+        """
+        Update the rows from the list of projects. Rows are identified by the project UUID so that only the
+        added, removed or modified projects are updated. The selection and the sort order are kept.
+        """
+        projects = {}
         for solution in data:
             if solution.name == '':
                 continue
             project_type = 'Standard' if solution.project_type == 'StandardProject' else solution.project_type
-            self.insert(
-                '',
-                tk.END,
-                text=solution.uuid,  # Used on double-click event
-                values=(
-                    solution.name,
-                    solution.author,
-                    solution.last_modified.strftime('%Y-%m-%d %H:%M:%S'),
-                    project_type
-                )
+            projects[solution.uuid] = (
+                solution.name,
+                solution.author,
+                solution.last_modified.strftime('%Y-%m-%d %H:%M:%S'),
+                project_type
             )
+            # The tag count of a modified project is no longer valid
+            if self.exists(solution.uuid) and self.item(solution.uuid, 'values')[:4] != projects[solution.uuid]:
+                self._tag_counts.pop(solution.uuid, None)
+            projects[solution.uuid] += (self._tag_counts.get(solution.uuid, ''),)
+
+        removed = [iid for iid in self.get_children() if iid not in projects]
+        if removed:
+            self.delete(*removed)
+            for iid in removed:
+                self._tag_counts.pop(iid, None)
+        for index, (uuid, values) in enumerate(projects.items()):
+            if not self.exists(uuid):
+                self.insert(
+                    '',
+                    index,
+                    iid=uuid,
+                    text=uuid,  # Used on double-click event
+                    values=values
+                )
+                continue
+            if self.item(uuid, 'values') != values:
+                self.item(uuid, values=values)
+            if self._sort is None and self.index(uuid) != index:
+                self.move(uuid, '', index)
+
+        if self._sort:
+            callback, column, reverse = self._sort
+            callback(column, reverse)
+
+    def get_tag_count(self, uuid: str) -> int | None:
+        count = self._tag_counts.get(uuid)
+        return None if count is None else int(count)
+
+    def set_tag_count(self, uuid: str, count: int):
+        if not self.exists(uuid):
+            return
+        self._tag_counts[uuid] = str(count)
+        self.set(uuid, 'Tags', self._tag_counts[uuid])
 
     def disable_selection(self):
         self.config(selectmode="none")
 
     def enable_selection(self):
-        self.config(selectmode="browse")
+        # Several projects can be selected to be exported at once
+        self.config(selectmode="extended")
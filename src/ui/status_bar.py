@@ -8,6 +8,7 @@ class StatusBar(tk.Frame):
         super().__init__(master, **kwargs)
         self.label = TruncatedLabel(self)
         self.label.pack(side=tk.LEFT)
+        self.cancel_button = tk.Button(self, text='Cancel')
         self.pack(side=tk.BOTTOM, fill=tk.X)
 
     def set_text(self, value: str):
@@ -16,3 +17,10 @@ class StatusBar(tk.Frame):
 
     def clear_text(self):
         self.label.config(text='')
+
+    def show_cancel_button(self, command):
+        self.cancel_button.config(command=command)
+        self.cancel_button.pack(side=tk.RIGHT)
+
+    def hide_cancel_button(self):
+        self.cancel_button.pack_forget()
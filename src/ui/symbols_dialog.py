@@ -1,32 +1,104 @@
 import tkinter as tk
+from tkinter import ttk
 from tkinter.filedialog import asksaveasfilename
 
+from exporters import EXPORTERS
+from symbol_index import SymbolIndex
 from .symbols_treeview import SymbolsTreeview
 
 
+# Delay after the last keystroke before the filter is applied (ms)
+FILTER_DELAY = 150
+
+# Delay between two searches of the next matches of the filter, leaving time to the UI events (ms)
+FETCH_DELAY = 1
+
+
 class SymbolsDialog(tk.Toplevel):
-    def __init__(self, master, solution, symbols, task_queue, **kwargs):
+    def __init__(self, master, solution, symbols, task_queue, index: SymbolIndex = None, **kwargs):
         super().__init__(master, **kwargs)
         self.solution = solution
         self.symbols = symbols
         self.task_queue = task_queue
+        self.index = index
+        self._filter_job = None
+        self._fetch_job = None
+        self._matching_symbols = None
 
         self.minsize(300, 100)
         self.title(f'Global data - {solution.name}')
 
         tk.Label(self, text=f'{len(self.symbols)} symbols found from project {solution.name}.').pack(pady=10)
         tk.Button(self, text='Export to file', command=self.export_symbols).pack()
+
+        filter_frame = ttk.Frame(self, padding=(10, 10, 10, 0))
+        ttk.Label(filter_frame, text='Filter:').pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', self._on_filter_change)
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.filter_count_label = ttk.Label(filter_frame, text='')
+        self.filter_count_label.pack(side=tk.LEFT)
+        filter_frame.pack(fill=tk.X)
+        # eg: "gAxis[3].Status.*", "Speed type:REAL", "comment:alarm"
+        filter_entry.focus_set()
+
         self.symbols_treeview = SymbolsTreeview(self)
         self.symbols_treeview.update_symbols(self.symbols)
 
         # Make dialog modal
         self.grab_set()
 
+    def _on_filter_change(self, *args):
+        # Wait for the user to stop typing before filtering
+        if self._filter_job:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DELAY, self.apply_filter)
+
+    def apply_filter(self):
+        self._filter_job = None
+        if self._fetch_job:
+            self.after_cancel(self._fetch_job)
+            self._fetch_job = None
+        query = self.filter_var.get().strip()
+        if not query:
+            self._matching_symbols = None
+            self.symbols_treeview.update_symbols(self.symbols)
+            self.filter_count_label.config(text='')
+            return
+        if self.index is None:
+            self.index = SymbolIndex(self.symbols)
+        self._matching_symbols = self.index.search(query)
+        self._matching_symbols.fetch()
+        self.symbols_treeview.update_symbols(self._matching_symbols)
+        self._update_matching_count()
+
+    def _fetch_matching_symbols(self):
+        # The matches are searched step by step so that the dialog stays responsive while the list is filled
+        self._fetch_job = None
+        self._matching_symbols.fetch()
+        self.symbols_treeview.refresh()
+        self._update_matching_count()
+
+    def _update_matching_count(self):
+        matching_symbols = self._matching_symbols
+        if matching_symbols.complete:
+            self.filter_count_label.config(text=f'{len(matching_symbols)} matching')
+        else:
+            self.filter_count_label.config(text=f'{len(matching_symbols)}+ matching')
+            self._fetch_job = self.after(FETCH_DELAY, self._fetch_matching_symbols)
+
+    def destroy(self):
+        for job in (self._filter_job, self._fetch_job):
+            if job:
+                self.after_cancel(job)
+        super().destroy()
+
     def export_symbols(self):
         saveasfilename = asksaveasfilename(
             initialfile=f'{self.solution.name}_symbols',
             defaultextension='.txt',
-            filetypes=[('txt files', '.txt'), ('All files', '.*')]
+            filetypes=[(cls.description, cls.extension) for cls in EXPORTERS.values()] + [('All files', '.*')]
         )
         if saveasfilename:
             command = 'save_symbols_to_file'
@@ -3,6 +3,13 @@ from tkinter import ttk
 
 
 class SymbolsTreeview(ttk.Treeview):
+    """
+    Virtualized list of symbols: the Treeview only holds the rows of the visible area.
+
+    A fixed pool of rows is filled from the symbols sequence (eg: a SymbolTable) at the current scroll offset
+    each time the view is scrolled or resized, so displaying the symbols takes the same time and memory
+    whatever their number. The vertical scrollbar, the mouse wheel and the navigation keys move that offset.
+    """
     def __init__(self, master):
         frame = ttk.Frame(master, padding=10)
         super().__init__(
@@ -21,26 +28,119 @@ class SymbolsTreeview(ttk.Treeview):
         self.column("Name", width=300, anchor='w', stretch=False)
         self.column("Type", width=150, anchor='center', stretch=False)
 
-        # Create scrollbars
-        v_scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.yview)
+        # Create scrollbars. The vertical one scrolls the symbols, not the Treeview rows.
+        self.v_scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self._on_scrollbar)
         h_scrollbar = ttk.Scrollbar(frame, orient=tk.HORIZONTAL, command=self.xview)
-        self.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.configure(xscrollcommand=h_scrollbar.set)
 
         # Pack the Treeview, scrollbars and frame
-        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         frame.pack(fill=tk.BOTH, expand=True)
 
+        self._symbols = ()
+        self._offset = 0       # Index of the symbol displayed in the first row
+        self._selected = None  # Index of the selected symbol
+        self._pool = []
+        self._resize_pool(int(self.cget('height')))
+
+        self.bind('<Configure>', self._on_configure)
+        self.bind('<<TreeviewSelect>>', self._on_select)
+        self.bind('<MouseWheel>', self._on_mouse_wheel)
+        self.bind('<Button-4>', lambda e: self._scroll(-3))
+        self.bind('<Button-5>', lambda e: self._scroll(3))
+        self.bind('<Up>', lambda e: self._move_selection(-1))
+        self.bind('<Down>', lambda e: self._move_selection(1))
+        self.bind('<Prior>', lambda e: self._move_selection(-len(self._pool)))
+        self.bind('<Next>', lambda e: self._move_selection(len(self._pool)))
+        self.bind('<Home>', lambda e: self._move_selection(-len(self._symbols)))
+        self.bind('<End>', lambda e: self._move_selection(len(self._symbols)))
+
     def update_symbols(self, data):
-        self.delete(*self.get_children())
-        for symbol in data:
-            self.insert(
-                '',
-                tk.END,
-                text=symbol.name,
-                values=(
-                    symbol.name,
-                    symbol.base_type
-                )
-            )
+        """ Display a sequence of objects having name and base_type attributes, eg: a SymbolTable """
+        self._symbols = data if hasattr(data, '__getitem__') else list(data)
+        self._offset = 0
+        self._selected = None
+        self._render()
+
+    def refresh(self):
+        """ Display the symbols again, eg: after more of them have been added to the sequence """
+        self._render()
+
+    def _row_count(self, height: int) -> int:
+        """ Number of rows fitting in the given widget height """
+        bbox = self.bbox(self._pool[0]) if self._pool else ''
+        if bbox:
+            _, heading_height, _, row_height = bbox
+        else:
+            row_height = int(ttk.Style(self).lookup('Treeview', 'rowheight') or 20)
+            heading_height = row_height
+        return max(1, (height - heading_height) // row_height)
+
+    def _resize_pool(self, count: int):
+        while len(self._pool) < count:
+            self._pool.append(self.insert('', tk.END, values=('', '')))
+        if len(self._pool) > count:
+            self.delete(*self._pool[count:])
+            del self._pool[count:]
+
+    def _render(self):
+        count = len(self._symbols)
+        self._offset = max(0, min(self._offset, count - len(self._pool)))
+        selection = ()
+        for row, iid in enumerate(self._pool):
+            index = self._offset + row
+            if index < count:
+                symbol = self._symbols[index]
+                # The index of the displayed symbol is kept as the (hidden) item text
+                self.item(iid, text=index, values=(symbol.name, symbol.base_type))
+                if index == self._selected:
+                    selection = (iid,)
+            else:
+                self.item(iid, text='', values=('', ''))
+        self.selection_set(selection)
+
+        if count:
+            self.v_scrollbar.set(self._offset / count, min(1.0, (self._offset + len(self._pool)) / count))
+        else:
+            self.v_scrollbar.set(0.0, 1.0)
+
+    def _scroll(self, rows: int):
+        self._offset += rows
+        self._render()
+        return 'break'
+
+    def _move_selection(self, rows: int):
+        if not len(self._symbols):
+            return 'break'
+        index = 0 if self._selected is None else self._selected + rows
+        self._selected = max(0, min(index, len(self._symbols) - 1))
+        # Scroll to keep the selected symbol visible
+        if self._selected < self._offset:
+            self._offset = self._selected
+        elif self._selected >= self._offset + len(self._pool):
+            self._offset = self._selected - len(self._pool) + 1
+        self._render()
+        return 'break'
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self._offset = int(float(value) * len(self._symbols))
+            self._render()
+        elif action == 'scroll':
+            self._scroll(int(value) * (len(self._pool) if unit == 'pages' else 1))
+
+    def _on_mouse_wheel(self, event):
+        # Windows reports multiples of 120, macOS reports smaller deltas
+        return self._scroll(-3 * (event.delta // 120 or (1 if event.delta > 0 else -1)))
+
+    def _on_configure(self, event):
+        self._resize_pool(self._row_count(event.height))
+        self._render()
+
+    def _on_select(self, event):
+        selection = self.selection()
+        if selection:
+            text = self.item(selection[0], 'text')
+            self._selected = int(text) if text != '' else None
@@ -0,0 +1,194 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+from batch_export import export_solutions_to_archive
+from exporters import format_from_filename
+from instrumentation import profiling
+from progress import CancellationToken, ExportCancelled, ProgressReporter
+from solution_cache import SolutionCache
+from solution_discovery import ProjectIndex
+from symbol_expansion import TagLimitExceeded
+from symbol_index import SymbolIndex
+from sysmac_solution import SysmacSolution, get_solutions
+from utils import export_symbols_to_file
+
+
+logger = logging.getLogger(__name__)
+
+# Commands of which only the result of the latest request is of interest
+SUPERSEDED_COMMANDS = ('get_solutions', 'estimate_symbols')
+
+# Minimum delay between two progress messages of a task (s)
+PROGRESS_INTERVAL = 0.2
+
+
+def get_vars_from_solution(solutions_path, solution_uuid, cache=None, progress=None, cancel=None, max_tags=None):
+    solution = SysmacSolution(solutions_path, solution_uuid, cache=cache)
+    symbols = solution.get_published_symbols(progress, cancel, max_tags)
+    return solution, symbols
+
+
+class _Task:
+    __slots__ = ('command', 'token')
+
+    def __init__(self, command: str):
+        self.command = command
+        self.token = CancellationToken()
+
+
+class TaskExecutor(threading.Thread):
+    """
+    Run the time-consuming tasks of the UI on a pool of worker threads.
+
+    Tasks are read from task_queue as (command, cmd_args) and their results are put on result_queue as
+    (command, data). Independent tasks run concurrently, so a slow project expansion does not delay a path change
+    or an export. Besides the task commands, the following commands are handled:
+    - ('cancel', command): the pending and running tasks of that command (or of every command if None)
+      are cancelled, their results are not reported. Running expansions are interrupted, running project
+      refreshes and archive exports stop at the next project.
+    - ('stop', None): cancels every task and stops the executor
+    A get_solutions request cancels the previous ones: only the result of the latest one is reported.
+    When a task fails, ('error', {'command': command, 'error': exception}) is reported instead of its result.
+    While a project is loaded, ('progress', {'command': command, 'progress': Progress}) messages are reported.
+    With max_tags, the projects which would produce more symbols are not expanded: their task fails.
+    """
+    def __init__(self, task_queue, result_queue, max_workers: int = None, project_index: ProjectIndex = None,
+                 project_index_file=None, max_tags: int = None, cache_dir=None):
+        super().__init__(daemon=True)
+        self.task_queue = task_queue
+        self.result_queue = result_queue
+        self.max_workers = max_workers
+        self.max_tags = max_tags
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='TaskExecutor')
+        # Without cache_dir, the project files are parsed each time a project is loaded
+        self.cache_dir = cache_dir
+        self.cache = SolutionCache(cache_dir) if cache_dir is not None else None
+        # Only the projects modified since the index was saved are read again
+        self.project_index = project_index or ProjectIndex()
+        self.project_index_file = project_index_file
+        # Refreshes must not overlap, or a superseded one could publish its projects after the latest one
+        self._project_index_lock = threading.Lock()
+        self._tasks: Dict[Future, _Task] = {}
+        self._tasks_lock = threading.Lock()
+        self.handlers = {
+            'get_solutions': self.get_solutions,
+            'get_vars_from_solution': self.get_vars_from_solution,
+            'estimate_symbols': self.estimate_symbols,
+            'save_symbols_to_file': self.save_symbols_to_file,
+            'export_projects_to_archive': self.export_projects_to_archive,
+        }
+
+    def run(self):
+        while True:
+            command, cmd_args = self.task_queue.get()
+            if command == 'stop':
+                self.cancel()
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                break
+            elif command == 'cancel':
+                self.cancel(cmd_args)
+            elif command in self.handlers:
+                self.submit(command, cmd_args)
+            else:
+                logger.warning(f'Unknown command "{command}"')
+
+    def submit(self, command: str, cmd_args):
+        if command in SUPERSEDED_COMMANDS:
+            self.cancel(command)
+        task = _Task(command)
+        with self._tasks_lock:
+            future = self.pool.submit(self._run_task, task, cmd_args)
+            self._tasks[future] = task
+        future.add_done_callback(self._forget_task)
+
+    def cancel(self, command: str = None):
+        with self._tasks_lock:
+            tasks = [(future, task) for future, task in self._tasks.items()
+                     if command is None or task.command == command]
+        # Cancelling a pending future runs its done callbacks, which take the lock
+        for future, task in tasks:
+            task.token.cancel()
+            future.cancel()
+
+    def _forget_task(self, future: Future):
+        with self._tasks_lock:
+            self._tasks.pop(future, None)
+
+    def _run_task(self, task: _Task, cmd_args):
+        if task.token.cancelled:
+            return
+        try:
+            data = self.handlers[task.command](task, *cmd_args)
+        except ExportCancelled:
+            return
+        except Exception as e:
+            if isinstance(e, TagLimitExceeded):
+                logger.warning(f'Task "{task.command}" failed: {e}')
+            else:
+                logger.exception(f'Task "{task.command}" failed')
+            if not task.token.cancelled:
+                self.result_queue.put(('error', {'command': task.command, 'error': e}))
+            return
+        if not task.token.cancelled:
+            self.result_queue.put((task.command, data))
+
+    def _progress_reporter(self, task: _Task) -> ProgressReporter:
+        def report(progress):
+            if not task.token.cancelled:
+                self.result_queue.put(('progress', {'command': task.command, 'progress': progress}))
+        return ProgressReporter(report, interval=PROGRESS_INTERVAL)
+
+    def get_solutions(self, task: _Task, solutions_path):
+        # A superseded refresh stops at the next project directory, releasing the lock for the latest one
+        with self._project_index_lock:
+            task.token.check()
+            solutions = get_solutions(solutions_path, index=self.project_index, cancel=task.token)
+            if self.project_index_file:
+                self.project_index.save(self.project_index_file)
+            return solutions
+
+    def get_vars_from_solution(self, task: _Task, solutions_path, solution_uuid):
+        with profiling() as profiler:
+            solution, symbols = get_vars_from_solution(solutions_path, solution_uuid, cache=self.cache,
+                                                       progress=self._progress_reporter(task), cancel=task.token,
+                                                       max_tags=self.max_tags)
+        return {
+            'solution': solution,
+            'symbols': symbols,
+            'index': SymbolIndex(symbols),
+            'report': profiler.report()
+        }
+
+    def estimate_symbols(self, task: _Task, solutions_path, solution_uuid):
+        # The files parsed are cached: the project is loaded faster if it is opened next
+        solution = SysmacSolution(solutions_path, solution_uuid, cache=self.cache)
+        return {
+            'uuid': solution_uuid,
+            'count': solution.estimate_published_symbols()
+        }
+
+    def save_symbols_to_file(self, task: _Task, solution, symbols, filename):
+        with profiling() as profiler:
+            export_symbols_to_file(symbols, filename, format_from_filename(filename))
+        return {
+            'solution': solution,
+            'filename': filename,
+            'report': profiler.report()
+        }
+
+    def export_projects_to_archive(self, task: _Task, solutions_path, solution_uuids, filename):
+        solutions = [SysmacSolution(solutions_path, uuid) for uuid in solution_uuids]
+        # The format of the symbols files is given by the inner extension, eg: symbols.jsonl.zip
+        # The projects are exported by threads rather than by processes, which are not available in every build
+        results = export_solutions_to_archive(solutions_path, solutions, filename, max_workers=self.max_workers,
+                                              cache_dir=self.cache_dir,
+                                              export_format=format_from_filename(Path(filename).stem),
+                                              executor_class=ThreadPoolExecutor, max_tags=self.max_tags,
+                                              cancel=task.token)
+        return {
+            'filename': filename,
+            'results': results
+        }
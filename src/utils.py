@@ -1,49 +1,72 @@
-import csv
 import os
+import re
 import sys
 import xml.etree.ElementTree as ET
-from typing import Dict, List
+from typing import Collection, Dict, List, Mapping
 
+from exporters import get_exporter
+from instrumentation import get_profiler
+from symbol_table import SymbolTable
 from sysmac_data_type import SysmacDataType
 
 
-def export_symbols_to_file(symbols, filename):
-    symbols_data = [
-        {
-            'NAME': s.name,
-            'DATATYPE': s.base_type,
-            'COMMENT': s.comment,
-            'TAGLINK': 'TRUE',
-            'RW': 'RW',
-        }
-        for s in symbols
-    ]
-    fieldnames = ['HOST', 'NAME', 'DATATYPE', 'ADDRESS', 'COMMENT', 'TAGLINK', 'RW', 'POU']
-    # From Weintek documentation, the file should be in ANSI format. Hence, the CP1252 encoding
-    with open(filename, 'w', newline='', encoding='cp1252') as f:
-        writer = csv.DictWriter(f, delimiter='\t', fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(symbols_data)
-
-
-def get_struct_from_namespace(xml_root: ET.Element, namespace: str):
-    data = {}
-    for type_def in xml_root.findall(".//DataType[@BaseType='STRUCT']"):
-        data_type = SysmacDataType.import_from_xml(type_def, namespace=namespace)
-        if data_type.namespace is not None:
-            data[f'{data_type.namespace}\\{data_type.name}'] = data_type
-        else:
-            data[f'{data_type.name}'] = data_type
-    return data
+def export_symbols_to_file(symbols, filename, export_format: str = 'weintek', **options) -> int:
+    """
+    Write the symbols as they are produced by the iterable. Returns the number of symbols written.
+    The format is one of the exporters.EXPORTERS, options are passed to its exporter (eg: columns for 'csv').
+    """
+    if isinstance(symbols, SymbolTable):
+        rows = symbols.rows()
+    else:
+        rows = ((s.name, s.base_type, s.comment) for s in symbols)
+
+    exporter = get_exporter(export_format, **options)
+    profiler = get_profiler()
+    with profiler.stage('write'):
+        count = exporter.export(rows, filename)
+    profiler.count('symbols written', count)
+    return count
+
+
+def load_data_types(file_path, namespace: str = None) -> Dict[str, SysmacDataType]:
+    """
+    Get the STRUCT and ENUM types defined in a namespace DataType file.
 
-def get_enum_from_namespace(xml_root: ET.Element, namespace: str):
+    The file is read in a single streaming pass and each DataType element is converted once, when it starts.
+    Each type definition is released from the XML tree as soon as it ends so that the memory usage depends
+    on the largest definition rather than on the file size.
+    """
     data = {}
-    for type_def in xml_root.findall(".//DataType[@BaseType='ENUM']"):
-        data_type = SysmacDataType.import_from_xml(type_def, namespace=namespace)
-        if data_type.namespace is not None:
-            data[f'{data_type.namespace}\\{data_type.name}'] = data_type
-        else:
-            data[f'{data_type.name}'] = data_type
+    elements = []    # Stack of the XML elements being parsed
+    data_types = []  # Stack of the DataType being built, members are attached to their parent on the fly
+    with open(file_path, 'rb') as f:
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                elements.append(elem)
+                if elem.tag == 'DataType':
+                    parent = data_types[-1] if data_types else None
+                    data_type = SysmacDataType.import_from_xml(elem, namespace=namespace, parent=parent,
+                                                               with_children=False)
+                    if parent is not None:
+                        parent.children.append(data_type)
+                    data_types.append(data_type)
+                continue
+
+            elements.pop()
+            if elem.tag != 'DataType':
+                continue
+            data_type = data_types.pop()
+            # Only the outermost definitions are types: the nested ones are inline members of their parent
+            if data_type.base_type in ('STRUCT', 'ENUM') and not data_types:
+                if data_type.namespace is not None:
+                    data[f'{data_type.namespace}\\{data_type.name}'] = data_type
+                else:
+                    data[f'{data_type.name}'] = data_type
+            if not data_types:
+                # The whole type definition has been converted: drop it from the tree
+                elem.clear()
+                if elements:
+                    elements[-1].remove(elem)
     return data
 
 def parse_slwd(file_path) -> List[Dict[str, str]]:
@@ -66,6 +89,46 @@ def parse_slwd(file_path) -> List[Dict[str, str]]:
             variables.append(var_data)
     return variables
 
+# Fields of the SLWD records used to build the global variables
+SLWD_FIELDS = ('N', 'D', 'NTP', 'IV', 'Com')
+
+
+def _slwd_record_pattern(where: Mapping[str, Collection[str]] = None) -> re.Pattern:
+    """ Regular expression matching the lines of the records whose fields have one of the given values """
+    conditions = ''
+    for key, values in (where or {}).items():
+        alternatives = '|'.join(map(re.escape, values))
+        conditions += rf'(?=[^\n]*\t{re.escape(key)}=(?:{alternatives})(?=\t|[ \t]*$))'
+    return re.compile(rf'\+\+D={conditions}([^\n]*)')
+
+
+def read_slwd(file_path, where: Mapping[str, Collection[str]] = None,
+              fields: Collection[str] = SLWD_FIELDS) -> List[Dict[str, str]]:
+    """
+    Faster parse_slwd returning only the records matching a filter, eg: where={'NTP': PUBLICATION_VALUES}.
+
+    The file is read line by line and each line is matched by a single regular expression, which rejects
+    the non-matching records before any of their fields are decoded. Only the given fields are kept
+    in the records ('D' is always kept).
+    """
+    pattern = _slwd_record_pattern(where)
+    fields = set(fields)
+    variables = []
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            match = pattern.match(line)
+            if match is None:
+                continue
+            parts = match.group(1).rstrip().split('\t')
+            var_data = {'D': parts[0]}
+            for part in parts[1:]:
+                key, sep, value = part.partition('=')
+                if sep and key in fields:
+                    var_data[key] = value
+            variables.append(var_data)
+    return variables
+
+
 def resource_path(relative_path):
     """ Get absolute path to resource, mandatory for one-file mode bundle """
     base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
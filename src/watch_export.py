@@ -0,0 +1,200 @@
+import argparse
+import csv
+import hashlib
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from sysmac_array import parse_array_type
+from sysmac_data_type import SysmacDataType
+from sysmac_solution import SysmacSolution, get_solutions
+from symbol_expansion import LeafSymbol, SymbolExpander
+from symbol_table import SymbolTable
+from type_resolver import TypeResolver
+from utils import export_symbols_to_file
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExportDelta:
+    added: List[LeafSymbol] = field(default_factory=list)
+    removed: List[LeafSymbol] = field(default_factory=list)
+    changed: List[LeafSymbol] = field(default_factory=list)
+    reexpanded_globals: int = 0
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self):
+        return (f'{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed tags '
+                f'({self.reexpanded_globals} global variables expanded)')
+
+
+class TypeSignatures:
+    """
+    Content hash of each data type, including the types it refers to.
+    Two signatures are equal when the expansion of a variable of that type would give the same symbols.
+    """
+    def __init__(self, data_types: Dict[str, SysmacDataType], resolver: TypeResolver = None):
+        self.data_types = data_types
+        self.resolver = resolver or TypeResolver(data_types)
+        self._signatures: Dict[str, str] = {}
+
+    def of(self, base_type: str, namespace: str = None) -> str:
+        if base_type.startswith('ARRAY'):
+            base_type = parse_array_type(base_type)[1]
+        type_name = self.resolver.resolve(base_type, namespace)
+        if type_name is None:
+            return ''
+        signature = self._signatures.get(type_name)
+        if signature is None:
+            data_type = self.data_types[type_name]
+            content = [data_type.base_type]
+            content.extend(self._members(data_type.children, data_type.namespace))
+            signature = self._signatures[type_name] = hashlib.blake2b('\n'.join(content).encode('utf-8'),
+                                                                      digest_size=16).hexdigest()
+        return signature
+
+    def _members(self, members: List[SysmacDataType], namespace: str | None) -> Iterator[str]:
+        for c in members:
+            yield f'{c.name}\t{c.base_type}\t{c.comment}\t{self.of(c.base_type, namespace)}'
+            # Members of a STRUCT declared inline
+            yield from (f'{c.name}.{member}' for member in self._members(c.children, namespace))
+
+
+class IncrementalExporter:
+    """
+    Keep the export file of a project up to date.
+
+    The expansion of each published global variable is kept between two updates. On update, a global variable
+    is only expanded again when its declaration or one of the types it depends on has changed.
+    """
+    def __init__(self, solutions_path, uuid: str, filename, delta_filename=None):
+        self.solutions_path = Path(solutions_path)
+        self.uuid = uuid
+        self.filename = filename
+        self.delta_filename = delta_filename
+        self._files_signature: Dict[str, Tuple[int, int]] = {}
+        # Global variable name -> (declaration and type signature, leaf symbols)
+        self._expansions: Dict[str, Tuple[tuple, List[LeafSymbol]]] = {}
+
+    def _scan_files(self) -> Dict[str, Tuple[int, int]]:
+        with os.scandir(self.solutions_path / self.uuid) as entries:
+            return {e.name: (e.stat().st_mtime_ns, e.stat().st_size) for e in entries if e.is_file()}
+
+    def poll(self) -> bool:
+        """ Check whether a file of the project has been modified since the last update """
+        return self._scan_files() != self._files_signature
+
+    def update(self) -> ExportDelta:
+        self._files_signature = self._scan_files()
+        solution = SysmacSolution(self.solutions_path, self.uuid)
+        data_types = solution.get_data_types()
+        resolver = TypeResolver(data_types)
+        signatures = TypeSignatures(data_types, resolver)
+        expander = SymbolExpander(data_types, resolver)
+
+        delta = ExportDelta()
+        expansions = {}
+        for s in solution.get_published_vars():
+            declaration = (s.base_type, s.comment, signatures.of(s.base_type))
+            previous = self._expansions.get(s.name)
+            if previous is not None and previous[0] == declaration:
+                expansions[s.name] = previous
+                continue
+
+            symbols = list(expander.expand(s))
+            expansions[s.name] = (declaration, symbols)
+            delta.reexpanded_globals += 1
+            previous_symbols = {p.name: p for p in previous[1]} if previous is not None else {}
+            for symbol in symbols:
+                previous_symbol = previous_symbols.pop(symbol.name, None)
+                if previous_symbol is None:
+                    delta.added.append(symbol)
+                elif previous_symbol != symbol:
+                    delta.changed.append(symbol)
+            delta.removed.extend(previous_symbols.values())
+
+        resolver.log_failures()
+        for name in self._expansions.keys() - expansions.keys():
+            delta.removed.extend(self._expansions[name][1])
+        self._expansions = expansions
+
+        if delta:
+            self._write(delta)
+        return delta
+
+    def _write(self, delta: ExportDelta):
+        symbols = SymbolTable()
+        for _, global_symbols in self._expansions.values():
+            symbols.extend(global_symbols)
+        symbols.sort()
+        export_symbols_to_file(symbols, self.filename)
+
+        if self.delta_filename:
+            with open(self.delta_filename, 'w', newline='', encoding='cp1252') as f:
+                writer = csv.writer(f, delimiter='\t')
+                writer.writerow(['CHANGE', 'NAME', 'DATATYPE', 'COMMENT'])
+                for change, changed_symbols in (('ADDED', delta.added), ('REMOVED', delta.removed),
+                                                ('CHANGED', delta.changed)):
+                    writer.writerows([change, s.name, s.base_type, s.comment] for s in changed_symbols)
+
+    def watch(self, interval: float = 0.5):
+        """ Poll the project files and update the export each time they are saved. Runs until interrupted. """
+        logger.info(f'Initial export: {self.update()}')
+        while True:
+            time.sleep(interval)
+            if not self.poll():
+                continue
+            # Sysmac Studio writes several files on save: wait for them to be stable
+            files_signature = self._scan_files()
+            time.sleep(interval)
+            while self._scan_files() != files_signature:
+                files_signature = self._scan_files()
+                time.sleep(interval)
+            start = time.perf_counter()
+            try:
+                delta = self.update()
+            except Exception as e:
+                logger.error(f'Update failed: {e}')
+                continue
+            logger.info(f'{delta} in {time.perf_counter() - start:.2f}s')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Watch a Sysmac Studio project and export its published global variables each time it is saved.'
+    )
+    parser.add_argument('solutions_path', help='Solution directory (eg: C:\\OMRON\\Data\\Solution)')
+    parser.add_argument('project', help='Project UUID or name')
+    parser.add_argument('-o', '--output', required=True, help='Symbols file kept up to date')
+    parser.add_argument('-d', '--delta', help='File listing the tags added, removed or changed by the last save')
+    parser.add_argument('-i', '--interval', type=float, default=0.5, help='Polling interval in seconds')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    uuids = [s.uuid for s in get_solutions(args.solutions_path) if args.project in (s.uuid, s.name)]
+    if len(uuids) != 1:
+        print(f'{len(uuids)} projects match {args.project} in {args.solutions_path}', file=sys.stderr)
+        return 1
+
+    exporter = IncrementalExporter(args.solutions_path, uuids[0], args.output, args.delta)
+    try:
+        exporter.watch(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())